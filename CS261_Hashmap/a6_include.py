@@ -103,22 +103,57 @@ class SLNode:
     Singly Linked List node for use in a hash map
     """
 
-    def __init__(self, key: str, value: object, next: "SLNode" = None) -> None:
-        """Initialize node given a key and value."""
+    # Slots instead of a per-instance __dict__, since a map holds one node
+    # per entry
+    __slots__ = ('key', 'value', 'next', 'hash')
+
+    def __init__(self, key: str, value: object, next: "SLNode" = None,
+                 hash: int = None) -> None:
+        """
+        Initialize node given a key and value.
+        The full (un-modded) hash of the key is cached in the node.
+        """
         self.key = key
         self.value = value
         self.next = next
+        self.hash = hash
 
     def __str__(self) -> str:
         """Override string method to provide more readable output."""
         return '(' + str(self.key) + ': ' + str(self.value) + ')'
 
 
+class LRUNode(SLNode):
+    """
+    Node that is also linked into a map's recency list, which runs from the
+    least to the most recently used node
+    """
+
+    __slots__ = ('lru_prev', 'lru_next')
+
+    def __init__(self, key: str, value: object, next: SLNode = None,
+                 hash: int = None) -> None:
+        """
+        Initialize node given a key and value, linked only to itself in the
+        recency list.
+        """
+        super().__init__(key, value, next, hash)
+        self.lru_prev = self
+        self.lru_next = self
+
+
+# Reordering policies for LinkedList.lookup
+MOVE_TO_FRONT = 'move_to_front'
+TRANSPOSE = 'transpose'
+
+
 class LinkedListIterator:
     """
     Separate iterator class for LinkedList
     """
 
+    __slots__ = ('_node',)
+
     def __init__(self, current_node: SLNode) -> None:
         """Initialize the iterator with a node."""
         self._node = current_node
@@ -144,6 +179,9 @@ class LinkedList:
     Supported methods are: insert, remove, contains, length, iterator
     """
 
+    # A chaining map holds one list per bucket
+    __slots__ = ('_head', '_size')
+
     def __init__(self) -> None:
         """
         Initialize new linked list;
@@ -168,20 +206,35 @@ class LinkedList:
         """Return an iterator for the list, starting at the head."""
         return LinkedListIterator(self._head)
 
-    def insert(self, key: str, value: object) -> None:
+    def insert(self, key: str, value: object, hash: int = None) -> None:
         """Insert new node at front of the list."""
-        self._head = SLNode(key, value, self._head)
+        self._head = SLNode(key, value, self._head, hash)
+        self._size += 1
+
+    def push(self, node: SLNode) -> None:
+        """Insert an already built node at front of the list."""
+        node.next = self._head
+        self._head = node
         self._size += 1
 
-    def remove(self, key: str) -> bool:
+    def adopt(self, head: SLNode, size: int) -> None:
+        """
+        Make an already linked chain of size nodes, starting at head, the
+        contents of this (empty) list, without copying the nodes.
+        """
+        self._head = head
+        self._size = size
+
+    def remove(self, key: str, hash: int = None) -> bool:
         """
         Remove first node with matching key.
+        If hash is given, keys are only compared when the hashes match.
         Return True if removal was successful, False otherwise.
         """
         previous, node = None, self._head
         while node:
 
-            if node.key == key:
+            if (hash is None or node.hash == hash) and node.key == key:
                 if previous:
                     previous.next = node.next
                 else:
@@ -192,15 +245,46 @@ class LinkedList:
             previous, node = node, node.next
         return False
 
-    def contains(self, key: str) -> SLNode:
-        """Return node with matching key, or None if no match"""
+    def contains(self, key: str, hash: int = None) -> SLNode:
+        """
+        Return node with matching key, or None if no match.
+        If hash is given, keys are only compared when the hashes match.
+        """
         node = self._head
         while node:
-            if node.key == key:
+            if (hash is None or node.hash == hash) and node.key == key:
                 return node
             node = node.next
         return node
 
+    def lookup(self, key: str, hash: int = None,
+               reorder: str = None) -> SLNode:
+        """
+        Return node with matching key, or None if no match.
+        If hash is given, keys are only compared when the hashes match.
+        On a match the node is moved to the head of the list if reorder is
+        MOVE_TO_FRONT, or swapped with the node before it if reorder is
+        TRANSPOSE, so frequently used keys drift towards the head.
+        """
+        before_previous, previous, node = None, None, self._head
+        while node:
+            if (hash is None or node.hash == hash) and node.key == key:
+                if previous and reorder == MOVE_TO_FRONT:
+                    previous.next = node.next
+                    node.next = self._head
+                    self._head = node
+                elif previous and reorder == TRANSPOSE:
+                    previous.next = node.next
+                    node.next = previous
+                    if before_previous:
+                        before_previous.next = node
+                    else:
+                        self._head = node
+                return node
+
+            before_previous, previous, node = previous, node, node.next
+        return None
+
     def length(self) -> int:
         """Return the length of the list."""
         return self._size
@@ -210,10 +294,18 @@ class LinkedList:
 
 class HashEntry:
 
-    def __init__(self, key: str, value: object) -> None:
-        """Initialize an entry for use in a hash map."""
+    # Slots instead of a per-instance __dict__, since a map holds one entry
+    # per key
+    __slots__ = ('key', 'value', 'hash', 'is_tombstone')
+
+    def __init__(self, key: str, value: object, hash: int = None) -> None:
+        """
+        Initialize an entry for use in a hash map.
+        The full (un-modded) hash of the key is cached in the entry.
+        """
         self.key = key
         self.value = value
+        self.hash = hash
 
         # Set this value to True when you "delete" a HashEntry
         self.is_tombstone = False
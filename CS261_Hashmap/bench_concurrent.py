@@ -0,0 +1,166 @@
+# Name: Tom Haney
+# Course: CS261 - Data Structures
+# Description: Multi-threaded stress test and throughput benchmark for the
+#  concurrent Hash Map.
+#   - The stress test runs writer threads, each owning a range of keys that
+#     it puts and removes at random, next to reader threads that check a set
+#     of stable keys is always found with the right value while the table
+#     keeps resizing. The final contents are checked against what every
+#     writer expects.
+#   - The throughput benchmark runs a read-heavy mix (90% get, 9% put, 1%
+#     remove) on 1, 2, 4 and 8 threads, against the concurrent map and
+#     against the chaining map behind a single lock.
+#  Under a GIL, threads take turns running Python code, so the throughput
+#  numbers mostly show lock overhead. Free-threaded CPython runs them in
+#  parallel.
+#
+#  Usage: python bench_concurrent.py [operations per thread]
+
+import random
+import sys
+import threading
+import time
+
+import hash_map_concurrent
+import hash_map_sc
+from a6_include import hash_function_2
+
+
+class LockedMap:
+    """
+    The chaining map behind one lock, as a baseline.
+    """
+
+    def __init__(self) -> None:
+        self._map = hash_map_sc.HashMap(11, hash_function_2)
+        self._lock = threading.Lock()
+
+    def put(self, key: str, value: object) -> None:
+        with self._lock:
+            self._map.put(key, value)
+
+    def get(self, key: str) -> object:
+        with self._lock:
+            return self._map.get(key)
+
+    def remove(self, key: str) -> None:
+        with self._lock:
+            self._map.remove(key)
+
+
+def _run_threads(targets: list) -> float:
+    """
+    Runs each callable in targets on its own thread, returning the seconds
+      taken until all of them finish.
+    """
+    threads = [threading.Thread(target=target) for target in targets]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - start
+
+
+def stress(operations: int, writers: int = 4, readers: int = 4) -> list:
+    """
+    Runs the stress test, returning a list of the problems found.
+    """
+    m = hash_map_concurrent.HashMap(11, hash_function_2, stripes=8)
+    stable = {'stable' + str(i): i for i in range(200)}
+    for key, value in stable.items():
+        m.put(key, value)
+
+    problems = []
+    expected = [{} for _ in range(writers)]
+    done = threading.Event()
+
+    def write(number):
+        rng = random.Random(number)
+        mine = expected[number]
+        for step in range(operations):
+            key = f"w{number}-{rng.randrange(operations // 2 + 1)}"
+            if rng.random() < 0.7:
+                m.put(key, step)
+                mine[key] = step
+            else:
+                m.remove(key)
+                mine.pop(key, None)
+
+    def read(number):
+        rng = random.Random(-number)
+        keys = list(stable)
+        while not done.is_set():
+            key = rng.choice(keys)
+            if m.get(key) != stable[key] or not m.contains_key(key):
+                problems.append(f"reader {number} lost {key}")
+                return
+
+    reader_threads = [threading.Thread(target=read, args=(number,))
+                      for number in range(readers)]
+    for thread in reader_threads:
+        thread.start()
+    _run_threads([lambda number=number: write(number)
+                  for number in range(writers)])
+    done.set()
+    for thread in reader_threads:
+        thread.join()
+
+    final = dict(stable)
+    for mine in expected:
+        final.update(mine)
+    if m.get_size() != len(final):
+        problems.append(f"size {m.get_size()}, expected {len(final)}")
+    for key, value in final.items():
+        if m.get(key) != value:
+            problems.append(f"{key} is {m.get(key)}, expected {value}")
+    pairs = m.get_keys_and_values()
+    if pairs.length() != len(final):
+        problems.append(f"{pairs.length()} pairs, expected {len(final)}")
+    return problems
+
+
+def throughput(m, threads: int, operations: int) -> float:
+    """
+    Returns the total operations per second of threads threads each doing
+      operations operations of the read-heavy mix on m.
+    """
+    keys = ['key' + str(i) for i in range(10000)]
+    for idx in range(0, len(keys), 2):
+        m.put(keys[idx], idx)
+
+    def work(number):
+        rng = random.Random(number)
+        for _ in range(operations):
+            key = rng.choice(keys)
+            choice = rng.random()
+            if choice < 0.9:
+                m.get(key)
+            elif choice < 0.99:
+                m.put(key, number)
+            else:
+                m.remove(key)
+
+    seconds = _run_threads([lambda number=number: work(number)
+                            for number in range(threads)])
+    return threads * operations / seconds
+
+
+def main(operations: int) -> None:
+    problems = stress(operations)
+    print(f"stress: {operations} operations per writer,",
+          'OK' if not problems else f"{len(problems)} problems")
+    for problem in problems[:10]:
+        print('  ', problem)
+
+    print(f"\n{'threads':>8}{'concurrent ops/s':>18}{'locked ops/s':>14}")
+    for threads in (1, 2, 4, 8):
+        concurrent = throughput(hash_map_concurrent.HashMap(11,
+                                                            hash_function_2),
+                                threads, operations)
+        locked = throughput(LockedMap(), threads, operations)
+        print(f"{threads:8}{concurrent:18.0f}{locked:14.0f}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 50000)
@@ -0,0 +1,78 @@
+# Name: Tom Haney
+# Course: CS261 - Data Structures
+# Description: Benchmark of find_mode_parallel against find_mode, to find the
+#  input size from which the process pool pays off on this machine. Each
+#  size is timed serially and with the pool forced on (min_keys=0) for each
+#  worker count, over token-like keys drawn from a fixed vocabulary. The
+#  smallest size at which some worker count beats find_mode is the value
+#  to use for PARALLEL_MIN_KEYS in hash_map_sc.py; with a single core there
+#  is none.
+#
+#  Usage: python bench_find_mode.py [largest number of keys]
+
+import os
+import random
+import sys
+import time
+
+import hash_map_sc
+from a6_include import DynamicArray
+
+
+VOCABULARY = 5000
+
+
+def make_input(count: int, seed: int = 261) -> DynamicArray:
+    """
+    Returns count keys drawn from VOCABULARY tokens, skewed so that some
+      tokens are far more common than others.
+    """
+    rng = random.Random(seed)
+    tokens = ['token' + str(idx) for idx in range(VOCABULARY)]
+    weights = [1 / (rank + 1) for rank in range(VOCABULARY)]
+    return DynamicArray(rng.choices(tokens, weights, k=count))
+
+
+def seconds(function) -> float:
+    """
+    Returns how long one call of function takes.
+    """
+    start = time.perf_counter()
+    function()
+    return time.perf_counter() - start
+
+
+def main(largest: int) -> None:
+    cpus = os.cpu_count() or 1
+    # One worker is just find_mode, so the pool starts at two
+    worker_counts = sorted({2, 4, max(cpus, 2)})
+    sizes = []
+    size = 10000
+    while size <= largest:
+        sizes.append(size)
+        size *= 4
+
+    print(f"find_mode vs find_mode_parallel, {cpus} CPUs (seconds)")
+    print(f"{'keys':>10}{'serial':>10}" +
+          ''.join(f"{str(workers) + ' workers':>12}"
+                  for workers in worker_counts))
+    crossover = None
+    for size in sizes:
+        da = make_input(size)
+        serial = seconds(lambda: hash_map_sc.find_mode(da))
+        parallel = [seconds(lambda: hash_map_sc.find_mode_parallel(
+                        da, workers, min_keys=0))
+                    for workers in worker_counts]
+        print(f"{size:10}{serial:10.2f}" +
+              ''.join(f"{taken:12.2f}" for taken in parallel))
+        if crossover is None and min(parallel) < serial:
+            crossover = size
+
+    if crossover is None:
+        print("The pool never beat find_mode here")
+    else:
+        print(f"The pool first beat find_mode at {crossover} keys")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 640000)
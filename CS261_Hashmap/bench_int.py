@@ -0,0 +1,80 @@
+# Name: Tom Haney
+# Course: CS261 - Data Structures
+# Description: Memory and throughput benchmark for the integer key Hash Map,
+#  against the open addressing and struct of arrays maps used the way the
+#  examples do with integer IDs: converting each one with str() first.
+#  hash_function_2 clusters badly on numeric strings (its cost grows with
+#  the square of the key count), so the string maps are also run with
+#  seeded FNV-1a for a fair comparison.
+#
+#  Usage: python bench_int.py [number of keys]
+
+import sys
+import time
+import tracemalloc
+
+import hash_map_int
+import hash_map_oa
+import hash_map_soa
+import hash_seeded
+from a6_include import hash_function_2
+
+
+def run(make_map, ids: list, convert=int) -> dict:
+    """
+    Builds a map from ids, then looks every id up and removes it, returning
+      the memory held by the full map (including any converted keys) and
+      each phase's throughput. Each id goes through convert on every call.
+    """
+    tracemalloc.start()
+    start = time.perf_counter()
+    m = make_map()
+    for id in ids:
+        m.put(convert(id), None)
+    put_time = time.perf_counter() - start
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    start = time.perf_counter()
+    for id in ids:
+        m.get(convert(id))
+    get_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for id in ids:
+        m.remove(convert(id))
+    remove_time = time.perf_counter() - start
+
+    return {
+        'bytes_per_entry': current / len(ids),
+        'put_ops_per_sec': len(ids) / put_time,
+        'get_ops_per_sec': len(ids) / get_time,
+        'remove_ops_per_sec': len(ids) / remove_time,
+    }
+
+
+def main(count: int) -> None:
+    # Large enough that small int caching does not hide the key objects
+    ids = [2 ** 40 + i for i in range(count)]
+    fnv1a = hash_seeded.make_fnv1a(261)
+
+    results = {
+        'int map': run(lambda: hash_map_int.HashMap(11), ids),
+        'oa, hash_function_2': run(
+            lambda: hash_map_oa.HashMap(11, hash_function_2), ids, str),
+        'oa, fnv1a': run(lambda: hash_map_oa.HashMap(11, fnv1a), ids, str),
+        'soa, fnv1a': run(lambda: hash_map_soa.HashMap(11, fnv1a), ids, str),
+    }
+
+    print(f"{count} integer IDs, converted with str() for the string maps")
+    print(f"{'':20}{'bytes/entry':>12}{'put ops/s':>12}"
+          f"{'get ops/s':>12}{'remove ops/s':>14}")
+    for name, result in results.items():
+        print(f"{name:20}{result['bytes_per_entry']:12.1f}"
+              f"{result['put_ops_per_sec']:12.0f}"
+              f"{result['get_ops_per_sec']:12.0f}"
+              f"{result['remove_ops_per_sec']:14.0f}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
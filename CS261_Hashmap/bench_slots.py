@@ -0,0 +1,145 @@
+# Name: Tom Haney
+# Course: CS261 - Data Structures
+# Description: Memory and throughput benchmark for the slotted SLNode /
+#  LinkedList classes and the iterator-free chain walk used by the chaining
+#  HashMap, compared against the original dict-based classes whose walks
+#  allocated a LinkedListIterator per lookup.
+#
+#  Usage: python bench_slots.py [number of keys]
+
+import sys
+import time
+import tracemalloc
+
+import hash_map_sc
+from a6_include import hash_function_2
+
+
+# --------- Original (pre-__slots__) classes, kept for comparison --------- #
+
+class DictSLNode:
+    def __init__(self, key, value, next=None, hash=None) -> None:
+        self.key = key
+        self.value = value
+        self.next = next
+        self.hash = hash
+
+
+class DictLinkedListIterator:
+    def __init__(self, current_node) -> None:
+        self._node = current_node
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if not self._node:
+            raise StopIteration
+        current_node = self._node
+        self._node = self._node.next
+        return current_node
+
+
+class DictLinkedList:
+    def __init__(self) -> None:
+        self._head = None
+        self._size = 0
+
+    def __iter__(self):
+        return DictLinkedListIterator(self._head)
+
+    def insert(self, key, value, hash=None) -> None:
+        self._head = DictSLNode(key, value, self._head, hash)
+        self._size += 1
+
+    def remove(self, key, hash=None) -> bool:
+        previous, node = None, self._head
+        while node:
+            if (hash is None or node.hash == hash) and node.key == key:
+                if previous:
+                    previous.next = node.next
+                else:
+                    self._head = node.next
+                self._size -= 1
+                return True
+            previous, node = node, node.next
+        return False
+
+    def contains(self, key, hash=None):
+        # Walks with a fresh iterator object, like the original put/get loops
+        for node in self:
+            if (hash is None or node.hash == hash) and node.key == key:
+                return node
+        return None
+
+    def lookup(self, key, hash=None, reorder=None):
+        # Chain policies are not benchmarked, so this is just a walk
+        return self.contains(key, hash)
+
+    def push(self, node) -> None:
+        node.next = self._head
+        self._head = node
+        self._size += 1
+
+    def adopt(self, head, size) -> None:
+        self._head = head
+        self._size = size
+
+    def length(self) -> int:
+        return self._size
+
+
+# ------------------------------------------------------------------------ #
+
+def run(keys: list) -> dict:
+    """
+    Builds a chaining map from keys and looks every key up, returning the
+      memory held by the map and the time taken by each phase.
+    """
+    tracemalloc.start()
+    start = time.perf_counter()
+    m = hash_map_sc.HashMap(11, hash_function_2)
+    for idx in range(len(keys)):
+        m.put(keys[idx], idx)
+    put_time = time.perf_counter() - start
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    start = time.perf_counter()
+    for key in keys:
+        m.get(key)
+    get_time = time.perf_counter() - start
+
+    return {
+        'bytes_per_entry': current / len(keys),
+        'peak_mb': peak / 2 ** 20,
+        'put_ops_per_sec': len(keys) / put_time,
+        'get_ops_per_sec': len(keys) / get_time,
+    }
+
+
+def main(count: int) -> None:
+    keys = ['key' + str(i) for i in range(count)]
+
+    results = {'slotted': run(keys)}
+
+    # Swap the original classes into the map module for the baseline run
+    slotted_list = hash_map_sc.LinkedList
+    hash_map_sc.LinkedList = DictLinkedList
+    try:
+        results['dict-based'] = run(keys)
+    finally:
+        hash_map_sc.LinkedList = slotted_list
+
+    print(f"{count} keys, hash_function_2")
+    print(f"{'':12}{'bytes/entry':>14}{'peak MB':>10}"
+          f"{'put ops/s':>14}{'get ops/s':>14}")
+    for name, result in results.items():
+        print(f"{name:12}{result['bytes_per_entry']:14.1f}"
+              f"{result['peak_mb']:10.1f}"
+              f"{result['put_ops_per_sec']:14.0f}"
+              f"{result['get_ops_per_sec']:14.0f}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200000)
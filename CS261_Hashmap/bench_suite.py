@@ -0,0 +1,417 @@
+# Name: Tom Haney
+# Course: CS261 - Data Structures
+# Description: Reproducible benchmark suite for the HashMap implementations.
+#  Runs put, get-hit, get-miss, remove, churn, resize-heavy and iteration
+#  workloads over uniform, Zipfian, sequential and adversarial-anagram key
+#  distributions, against every map and hash function, with Python's dict as
+#  a baseline. Results (ops/sec and per-operation latency percentiles) are
+#  written as JSON, and can be compared against a stored baseline to flag
+#  regressions in throughput and in p50/p99 latency.
+#
+#  Usage:
+#    python bench_suite.py                          run, print JSON
+#    python bench_suite.py -o results.json          run, write JSON
+#    python bench_suite.py --save-baseline          run, store as baseline
+#    python bench_suite.py --baseline               run, flag regressions
+#                                                   against the stored one
+#  See --help for filtering by map, hash function, workload or distribution.
+
+import argparse
+import itertools
+import json
+import platform
+import random
+import sys
+import time
+
+import hash_map_oa
+import hash_map_rh
+import hash_map_sc
+import hash_map_soa
+import hash_seeded
+from a6_include import hash_function_1, hash_function_2
+
+
+DEFAULT_BASELINE = 'bench_baseline.json'
+
+# Fixed seeds, so that every run hashes and orders keys identically
+SEED = 261
+HASH_FUNCTIONS = {
+    'hash_function_1': hash_function_1,
+    'hash_function_2': hash_function_2,
+    'fnv1a': hash_seeded.make_fnv1a(SEED),
+    'murmur3': hash_seeded.make_murmur3(SEED),
+    'siphash': hash_seeded.make_siphash(SEED, SEED),
+}
+
+
+# ----------------------------- Maps under test ---------------------------- #
+
+class DictMap:
+    """
+    Wraps a dict in the HashMap methods used by the workloads.
+    """
+
+    def __init__(self, capacity: int, function) -> None:
+        self._data = {}
+
+    def put(self, key: str, value: object) -> None:
+        self._data[key] = value
+
+    def get(self, key: str) -> object:
+        return self._data.get(key)
+
+    def remove(self, key: str) -> None:
+        self._data.pop(key, None)
+
+    def get_keys_and_values(self) -> list:
+        return list(self._data.items())
+
+
+MAPS = {
+    'sc': hash_map_sc.HashMap,
+    'oa': hash_map_oa.HashMap,
+    'rh': hash_map_rh.HashMap,
+    'soa': hash_map_soa.HashMap,
+    'dict': DictMap,
+}
+
+
+# ---------------------------- Key distributions --------------------------- #
+
+def uniform_keys(count: int, rng: random.Random) -> list:
+    """
+    count distinct keys drawn uniformly from a much larger key space.
+    """
+    numbers = rng.sample(range(count * 100), count)
+    return ['key' + str(number) for number in numbers]
+
+
+def zipfian_keys(count: int, rng: random.Random) -> list:
+    """
+    count keys drawn from count distinct keys with Zipfian (s = 1.1)
+      popularity, so a few hot keys repeat many times.
+    """
+    weights = [1 / (rank ** 1.1) for rank in range(1, count + 1)]
+    ranks = rng.choices(range(count), weights=weights, k=count)
+    return ['key' + str(rank) for rank in ranks]
+
+
+def sequential_keys(count: int, rng: random.Random) -> list:
+    """
+    key0, key1, key2, ... in order.
+    """
+    return ['key' + str(number) for number in range(count)]
+
+
+def anagram_keys(count: int, rng: random.Random) -> list:
+    """
+    count distinct anagrams of one string, which all share a single
+      hash_function_1 hash (and very few hash_function_2 hashes).
+    """
+    letters = 'abcdefghij'
+    keys = [''.join(p) for p in
+            itertools.islice(itertools.permutations(letters), count)]
+    rng.shuffle(keys)
+    return keys
+
+
+DISTRIBUTIONS = {
+    'uniform': uniform_keys,
+    'zipfian': zipfian_keys,
+    'sequential': sequential_keys,
+    'anagram': anagram_keys,
+}
+
+
+# -------------------------------- Workloads ------------------------------- #
+# Each workload builds what it needs, then times every operation on its own
+# and returns the list of per-operation latencies in nanoseconds.
+
+def _timed(operations) -> list:
+    """
+    Runs each zero argument callable in operations, timing each one.
+    """
+    clock = time.perf_counter_ns
+    latencies = []
+    for operation in operations:
+        start = clock()
+        operation()
+        latencies.append(clock() - start)
+    return latencies
+
+
+def _filled(make_map, keys: list, capacity: int):
+    """
+    Returns a new map holding every key in keys.
+    """
+    m = make_map(capacity)
+    for idx in range(len(keys)):
+        m.put(keys[idx], idx)
+    return m
+
+
+def put_workload(make_map, keys: list) -> list:
+    m = make_map(4 * len(keys))
+    return _timed(lambda key=key: m.put(key, 0) for key in keys)
+
+
+def get_hit_workload(make_map, keys: list) -> list:
+    m = _filled(make_map, keys, 4 * len(keys))
+    return _timed(lambda key=key: m.get(key) for key in keys)
+
+
+def get_miss_workload(make_map, keys: list) -> list:
+    m = _filled(make_map, keys, 4 * len(keys))
+    return _timed(lambda key=key: m.get(key + '#') for key in keys)
+
+
+def remove_workload(make_map, keys: list) -> list:
+    m = _filled(make_map, keys, 4 * len(keys))
+    return _timed(lambda key=key: m.remove(key) for key in keys)
+
+
+def churn_workload(make_map, keys: list) -> list:
+    # Keep a window of a quarter of the keys live: each step removes the
+    # oldest key and inserts the next one
+    window = max(1, len(keys) // 4)
+    m = _filled(make_map, keys[:window], 4 * window)
+
+    def step(idx):
+        m.remove(keys[idx - window])
+        m.put(keys[idx], idx)
+    return _timed(lambda idx=idx: step(idx)
+                  for idx in range(window, len(keys)))
+
+
+def resize_heavy_workload(make_map, keys: list) -> list:
+    # Start tiny so the table has to grow many times
+    m = make_map(1)
+    return _timed(lambda key=key: m.put(key, 0) for key in keys)
+
+
+def iteration_workload(make_map, keys: list) -> list:
+    # One timed traversal per 100 keys; reported per entry below
+    m = _filled(make_map, keys, 4 * len(keys))
+    return _timed(m.get_keys_and_values
+                  for _ in range(max(1, len(keys) // 100)))
+
+
+WORKLOADS = {
+    'put': put_workload,
+    'get_hit': get_hit_workload,
+    'get_miss': get_miss_workload,
+    'remove': remove_workload,
+    'churn': churn_workload,
+    'resize_heavy': resize_heavy_workload,
+    'iteration': iteration_workload,
+}
+
+
+# --------------------------------- Running -------------------------------- #
+
+def _percentile(ordered: list, fraction: float) -> int:
+    """
+    Returns the value at fraction of the way through a sorted list.
+    """
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def run_scenario(map_name: str, hash_name: str, workload: str,
+                 distribution: str, size: int) -> dict:
+    """
+    Runs one scenario once and returns its result record.
+    """
+    keys = DISTRIBUTIONS[distribution](size, random.Random(SEED))
+    map_class = MAPS[map_name]
+    function = HASH_FUNCTIONS.get(hash_name)
+
+    def make_map(capacity):
+        return map_class(capacity, function)
+
+    latencies = WORKLOADS[workload](make_map, keys)
+    total = sum(latencies)
+    ordered = sorted(latencies)
+
+    # A traversal handles every entry, so count entries rather than calls
+    ops = len(latencies)
+    if workload == 'iteration':
+        ops *= len(set(keys))
+
+    return {
+        'map': map_name,
+        'hash': hash_name,
+        'workload': workload,
+        'distribution': distribution,
+        'size': size,
+        'ops_per_sec': ops / (total / 1e9) if total else float('inf'),
+        'p50_ns': _percentile(ordered, 0.50),
+        'p90_ns': _percentile(ordered, 0.90),
+        'p99_ns': _percentile(ordered, 0.99),
+        'max_ns': ordered[-1],
+    }
+
+
+def run_suite(maps: list, hashes: list, workloads: list,
+              distributions: list, size: int, repeat: int = 3) -> dict:
+    """
+    Runs every combination of the given names and returns the full report.
+      Each scenario runs repeat times and the fastest run is kept, which
+      filters out most of the noise from the rest of the machine.
+    """
+    results = []
+    for map_name in maps:
+        # dict uses Python's own hashing, so it only runs once per scenario
+        map_hashes = ['builtin'] if map_name == 'dict' else hashes
+        for hash_name in map_hashes:
+            for workload in workloads:
+                for distribution in distributions:
+                    runs = [run_scenario(map_name, hash_name, workload,
+                                         distribution, size)
+                            for _ in range(repeat)]
+                    results.append(max(runs,
+                                       key=lambda run: run['ops_per_sec']))
+                    print('.', end='', file=sys.stderr, flush=True)
+    print(file=sys.stderr)
+
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'seed': SEED,
+        'repeat': repeat,
+        'results': results,
+    }
+
+
+def _scenario_id(result: dict) -> tuple:
+    return (result['map'], result['hash'], result['workload'],
+            result['distribution'], result['size'])
+
+
+# Fields every baseline result must have to be compared against
+_RESULT_FIELDS = ('map', 'hash', 'workload', 'distribution', 'size',
+                  'ops_per_sec', 'p50_ns', 'p99_ns')
+
+
+def load_baseline(path: str) -> dict:
+    """
+    Reads a stored report from path, raising ValueError if it is not one
+      that find_regressions can compare against.
+    """
+    with open(path) as file:
+        try:
+            baseline = json.load(file)
+        except json.JSONDecodeError as error:
+            raise ValueError(f"{path} is not valid JSON: {error}")
+
+    results = baseline.get('results') if isinstance(baseline, dict) else None
+    if not isinstance(results, list):
+        raise ValueError(f"{path} has no list of results")
+    for result in results:
+        missing = [field for field in _RESULT_FIELDS
+                   if not isinstance(result, dict) or field not in result]
+        if missing:
+            raise ValueError(f"{path} has a result without "
+                             f"{', '.join(missing)}")
+    return baseline
+
+
+def find_regressions(report: dict, baseline: dict, tolerance: float,
+                     latency_tolerance: float) -> list:
+    """
+    Returns a description of every scenario whose throughput fell more than
+      tolerance (a fraction) below the same scenario in baseline, or whose
+      p50 or p99 latency rose more than latency_tolerance above it.
+    """
+    previous = {_scenario_id(result): result
+                for result in baseline['results']}
+    regressions = []
+    for result in report['results']:
+        old = previous.get(_scenario_id(result))
+        if not old:
+            continue
+        name = '/'.join(str(part) for part in _scenario_id(result))
+
+        if result['ops_per_sec'] < old['ops_per_sec'] * (1 - tolerance):
+            change = result['ops_per_sec'] / old['ops_per_sec'] - 1
+            regressions.append(
+                f"{name}: {old['ops_per_sec']:.0f} -> "
+                f"{result['ops_per_sec']:.0f} ops/sec ({change:+.0%})")
+
+        for field in ('p50_ns', 'p99_ns'):
+            if result[field] > old[field] * (1 + latency_tolerance):
+                change = (result[field] / old[field] - 1 if old[field]
+                          else float('inf'))
+                regressions.append(
+                    f"{name}: {field[:3]} {old[field]} -> {result[field]} "
+                    f"ns ({change:+.0%})")
+    return regressions
+
+
+def main(argv: list = None) -> int:
+    parser = argparse.ArgumentParser(
+        description='Benchmark the HashMap implementations.')
+    parser.add_argument('--size', type=int, default=2000,
+                        help='keys per scenario (default 2000)')
+    parser.add_argument('--repeat', type=int, default=3,
+                        help='runs per scenario, fastest kept (default 3)')
+    parser.add_argument('--maps', nargs='+', choices=list(MAPS),
+                        default=list(MAPS))
+    parser.add_argument('--hashes', nargs='+', choices=list(HASH_FUNCTIONS),
+                        default=list(HASH_FUNCTIONS))
+    parser.add_argument('--workloads', nargs='+', choices=list(WORKLOADS),
+                        default=list(WORKLOADS))
+    parser.add_argument('--distributions', nargs='+',
+                        choices=list(DISTRIBUTIONS),
+                        default=list(DISTRIBUTIONS))
+    parser.add_argument('-o', '--output',
+                        help='write the JSON report here instead of stdout')
+    parser.add_argument('--baseline', nargs='?', const=DEFAULT_BASELINE,
+                        help='compare against a stored report '
+                             f'(default {DEFAULT_BASELINE})')
+    parser.add_argument('--save-baseline', nargs='?', const=DEFAULT_BASELINE,
+                        help='store this run as the baseline '
+                             f'(default {DEFAULT_BASELINE})')
+    parser.add_argument('--tolerance', type=float, default=0.2,
+                        help='allowed throughput drop before a scenario is '
+                             'flagged (default 0.2)')
+    parser.add_argument('--latency-tolerance', type=float, default=0.5,
+                        help='allowed p50/p99 latency rise before a scenario '
+                             'is flagged (default 0.5)')
+    args = parser.parse_args(argv)
+
+    # Check the baseline before spending minutes on the suite
+    baseline = None
+    if args.baseline:
+        try:
+            baseline = load_baseline(args.baseline)
+        except (OSError, ValueError) as error:
+            parser.error(f"cannot use baseline: {error}")
+
+    report = run_suite(args.maps, args.hashes, args.workloads,
+                       args.distributions, args.size, args.repeat)
+    text = json.dumps(report, indent=2)
+
+    if args.output:
+        with open(args.output, 'w') as file:
+            file.write(text + '\n')
+    elif not args.save_baseline:
+        print(text)
+
+    if args.save_baseline:
+        with open(args.save_baseline, 'w') as file:
+            file.write(text + '\n')
+
+    if baseline is not None:
+        regressions = find_regressions(report, baseline, args.tolerance,
+                                       args.latency_tolerance)
+        for regression in regressions:
+            print('REGRESSION', regression, file=sys.stderr)
+        if regressions:
+            return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
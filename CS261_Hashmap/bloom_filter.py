@@ -0,0 +1,106 @@
+# Name: Tom Haney
+# Course: CS261 - Data Structures
+# Description: Counting Bloom filter used in front of either HashMap, so that
+#  lookups of keys that are definitely absent return before touching any
+#  bucket. Each key sets k small counters instead of k bits, so removing a
+#  key is just decrementing them again. The filter works from the full hash
+#  the map already computes (and caches) for every key, deriving its k
+#  positions by double hashing, so it never calls the hash function itself.
+#  Sized from the number of entries expected and a target false positive
+#  rate.
+
+from math import ceil, exp, log
+
+from capacity_policy import fmix64
+
+
+_MASK_32 = (1 << 32) - 1
+_MASK_64 = (1 << 64) - 1
+
+# Counters stop here and are never decremented again, since whether the
+# keys counted past it are gone can no longer be known
+_SATURATED = 255
+
+
+class CountingBloomFilter:
+    """
+    Counting Bloom filter over full key hashes
+    """
+
+    __slots__ = ('_counters', '_num_counters', '_num_hashes', '_count')
+
+    def __init__(self, expected: int, fp_rate: float) -> None:
+        """
+        Sizes the filter to hold expected hashes with about fp_rate false
+          positives.
+        """
+        if not 0 < fp_rate < 1:
+            raise ValueError("fp_rate must be between 0 and 1")
+
+        expected = max(1, expected)
+        self._num_counters = max(8, ceil(-expected * log(fp_rate) /
+                                         log(2) ** 2))
+        self._num_hashes = max(1, round(self._num_counters / expected *
+                                        log(2)))
+        self._counters = bytearray(self._num_counters)
+        self._count = 0
+
+    def _positions(self, hash: int) -> list:
+        """
+        Returns the k counter positions of a hash, h1 + i * h2 for two
+          halves of its mixed bits.
+        """
+        mixed = fmix64(hash & _MASK_64)
+        h1 = mixed & _MASK_32
+        h2 = (mixed >> 32) | 1
+        return [(h1 + i * h2) % self._num_counters
+                for i in range(self._num_hashes)]
+
+    def add(self, hash: int) -> None:
+        """
+        Records a hash as present.
+        """
+        counters = self._counters
+        for pos in self._positions(hash):
+            if counters[pos] < _SATURATED:
+                counters[pos] += 1
+        self._count += 1
+
+    def remove(self, hash: int) -> None:
+        """
+        Forgets one earlier add of a hash. Must only be given hashes that
+          were added, or other keys may start to be missed.
+        """
+        counters = self._counters
+        for pos in self._positions(hash):
+            if counters[pos] < _SATURATED:
+                counters[pos] -= 1
+        self._count -= 1
+
+    def might_contain(self, hash: int) -> bool:
+        """
+        Returns False if the hash was definitely never added (or has been
+          removed), and True if it probably was.
+        """
+        # Same positions as _positions, but stopping at the first zero,
+        # which for an absent key is usually the first one
+        mixed = fmix64(hash & _MASK_64)
+        pos = mixed & _MASK_32
+        step = (mixed >> 32) | 1
+        counters = self._counters
+        num_counters = self._num_counters
+        for _ in range(self._num_hashes):
+            if not counters[pos % num_counters]:
+                return False
+            pos += step
+        return True
+
+    def false_positive_rate(self) -> float:
+        """
+        Returns the expected false positive rate for the hashes it holds.
+        """
+        k = self._num_hashes
+        return (1 - exp(-k * self._count / self._num_counters)) ** k
+
+    def __len__(self) -> int:
+        return self._count
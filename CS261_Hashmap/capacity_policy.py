@@ -0,0 +1,70 @@
+# Name: Tom Haney
+# Course: CS261 - Data Structures
+# Description: Capacity policies shared by the HashMap implementations.
+#  'prime' is the original behavior: the capacity is the next prime found by
+#  trial division and indices are hash % capacity. 'prime_table' picks the
+#  capacity from a precomputed table of roughly doubling primes instead of
+#  searching at runtime. 'power_of_two' rounds the capacity up to a power of
+#  two, runs each hash through a mixing finalizer and indexes with a mask.
+
+from bisect import bisect_left
+
+
+PRIME = 'prime'
+PRIME_TABLE = 'prime_table'
+POWER_OF_TWO = 'power_of_two'
+POLICIES = (PRIME, PRIME_TABLE, POWER_OF_TWO)
+
+# Each prime is the next prime after double the previous one
+DOUBLING_PRIMES = (
+    3, 7, 17, 37, 79, 163, 331, 673, 1361, 2729, 5471, 10949, 21911, 43853,
+    87719, 175447, 350899, 701819, 1403641, 2807303, 5614657, 11229331,
+    22458671, 44917381, 89834777, 179669557, 359339171, 718678369,
+    1437356741, 2874713497, 5749427029, 11498854069, 22997708177,
+    45995416409, 91990832831, 183981665689, 367963331389, 735926662813,
+)
+
+_MASK_64 = (1 << 64) - 1
+
+
+def check_policy(policy: str) -> None:
+    """
+    Raises a ValueError if policy is not one of the known policies.
+    """
+    if policy not in POLICIES:
+        raise ValueError(f"capacity_policy must be one of {POLICIES}")
+
+
+def table_prime(capacity: int) -> int:
+    """
+    Returns the smallest prime in DOUBLING_PRIMES that is at least capacity,
+      or None if capacity is beyond the end of the table.
+    """
+    idx = bisect_left(DOUBLING_PRIMES, capacity)
+    if idx < len(DOUBLING_PRIMES):
+        return DOUBLING_PRIMES[idx]
+    return None
+
+
+def next_power_of_two(capacity: int) -> int:
+    """
+    Returns the smallest power of two that is at least capacity (and at
+      least 2, so that there is always a mask bit to index with).
+    """
+    if capacity <= 2:
+        return 2
+    return 1 << (capacity - 1).bit_length()
+
+
+def fmix64(hash: int) -> int:
+    """
+    MurmurHash3's 64-bit finalizer. Spreads every input bit over the low
+      bits, which is what a power of two mask indexes with.
+    """
+    hash &= _MASK_64
+    hash ^= hash >> 33
+    hash = (hash * 0xff51afd7ed558ccd) & _MASK_64
+    hash ^= hash >> 33
+    hash = (hash * 0xc4ceb9fe1a85ec53) & _MASK_64
+    hash ^= hash >> 33
+    return hash
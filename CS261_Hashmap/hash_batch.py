@@ -0,0 +1,145 @@
+# Name: Tom Haney
+# Course: CS261 - Data Structures
+# Description: Batch versions of hash_function_1 and hash_function_2 that
+#  hash a whole sequence of keys at once. The keys are encoded into a single
+#  contiguous buffer of code points and hashed with vectorized NumPy
+#  operations. Falls back to calling the scalar function once per key when
+#  NumPy is not installed. Also groups cached hashes by bucket in one pass,
+#  for resizing.
+
+from a6_include import hash_function_1, hash_function_2
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+# hash_function_2 of a key of length L is at most max_code * L * (L + 1) / 2,
+# which only fits in 64 bits for keys up to a few million characters. Longer
+# keys are hashed with the scalar function instead.
+_MAX_VECTOR_KEY_LENGTH = 1 << 22
+
+
+def _encode(keys: list) -> tuple:
+    """
+    Encodes all keys into one uint64 array of code points (matching ord())
+      and returns it along with the start and end offset of each key.
+    """
+    lengths = np.fromiter((len(key) for key in keys), dtype=np.int64,
+                          count=len(keys))
+    ends = np.cumsum(lengths)
+    starts = ends - lengths
+
+    # UTF-32 stores exactly one code point per 4 bytes
+    buffer = ''.join(keys).encode('utf-32-le', 'surrogatepass')
+    codes = np.frombuffer(buffer, dtype=np.uint32).astype(np.uint64)
+    return codes, starts, ends
+
+
+def _segment_sums(values, starts, ends) -> list:
+    """
+    Sums each [start, end) segment of values via a running total. Unsigned
+      wraparound in the running total cancels out in the subtraction, so each
+      segment sum is exact as long as it fits in 64 bits itself.
+    """
+    totals = np.zeros(values.shape[0] + 1, dtype=np.uint64)
+    np.cumsum(values, out=totals[1:])
+    return (totals[ends] - totals[starts]).tolist()
+
+
+def _can_vectorize(keys: list) -> bool:
+    """
+    Returns whether the batch can be hashed with NumPy.
+    """
+    if np is None:
+        return False
+    for key in keys:
+        if type(key) is not str or len(key) > _MAX_VECTOR_KEY_LENGTH:
+            return False
+    return True
+
+
+def hash_function_1_batch(keys: list) -> list:
+    """
+    Returns a list with hash_function_1 applied to every key, in order.
+    """
+    if not _can_vectorize(keys):
+        return [hash_function_1(key) for key in keys]
+    if not keys:
+        return []
+
+    codes, starts, ends = _encode(keys)
+    return _segment_sums(codes, starts, ends)
+
+
+def hash_function_2_batch(keys: list) -> list:
+    """
+    Returns a list with hash_function_2 applied to every key, in order. Each
+      code point is weighted by its 1-based position within its own key.
+    """
+    if not _can_vectorize(keys):
+        return [hash_function_2(key) for key in keys]
+    if not keys:
+        return []
+
+    codes, starts, ends = _encode(keys)
+
+    # Position of each code point within its key, starting at 1
+    lengths = ends - starts
+    positions = np.arange(1, codes.shape[0] + 1, dtype=np.uint64)
+    positions -= np.repeat(starts, lengths).astype(np.uint64)
+    return _segment_sums(codes * positions, starts, ends)
+
+
+# Below this many hashes, grouping them one at a time is cheaper than the
+# fixed cost of the NumPy calls
+_MIN_GROUP_SIZE = 256
+
+_MASK_64 = (1 << 64) - 1
+
+
+def group_by_bucket(hashes: list, capacity: int, power_of_two: bool):
+    """
+    Computes the bucket index of every hash in one vectorized pass (the low
+      bits for power of two capacities, the remainder otherwise) and sorts
+      positions by bucket. Returns a list of the bucket index of each hash,
+      and a list of positions in bucket order, keeping the original order
+      within each bucket. Returns None when NumPy is not installed, when a
+      hash is negative or does not fit in 64 bits, or when there are too
+      few hashes for it to pay off.
+    """
+    if np is None or len(hashes) < _MIN_GROUP_SIZE:
+        return None
+
+    # Checked here rather than left to NumPy, as older versions silently
+    # wrap negative values into uint64 and so give the wrong indices
+    if min(hashes) < 0 or max(hashes) > _MASK_64:
+        return None
+    values = np.array(hashes, dtype=np.uint64)
+
+    if power_of_two:
+        indices = values & np.uint64(capacity - 1)
+    else:
+        indices = values % np.uint64(capacity)
+    order = np.argsort(indices, kind='stable')
+    return indices.tolist(), order.tolist()
+
+
+# Batch counterparts of the scalar hash functions
+_BATCH_FUNCTIONS = {
+    hash_function_1: hash_function_1_batch,
+    hash_function_2: hash_function_2_batch,
+}
+
+
+def hash_batch(keys: list, function) -> list:
+    """
+    Returns a list of function(key) for every key. Uses the vectorized
+      version when function is one of the sample hash functions, otherwise
+      simply calls function once per key.
+    """
+    batch_function = _BATCH_FUNCTIONS.get(function)
+    if batch_function is not None:
+        return batch_function(keys)
+    return [function(key) for key in keys]
@@ -0,0 +1,371 @@
+# Name: Tom Haney
+# Course: CS261 - Data Structures
+# Description: Implementation for a thread-safe chaining Hash Map that can be
+#  shared between threads.
+#   - Writers lock one of a fixed number of stripes, each covering a range
+#     of buckets, so puts and removes in different ranges run in parallel.
+#   - Readers take no locks. The buckets and their capacity are published
+#     together as one _Table object, which a reader grabs once. Chains are
+#     only changed by publishing a fully built node at the head, or by
+#     relinking past a removed node, so a walk in progress always sees a
+#     valid chain. Under free-threaded CPython this relies only on single
+#     attribute reads and writes being atomic.
+#   - A resize takes every stripe lock, so writers wait, but readers keep
+#     using the old table (which is copied, not changed) until the new one
+#     is published in a single assignment.
+#  Readers see each put and remove either entirely or not at all.
+#  Traversals (get_keys_and_values) are weakly consistent: they see the
+#  table as it was when they started, plus any changes made to it since.
+
+import threading
+
+import hash_map_sc
+from a6_include import DynamicArray, LinkedList, hash_function_1, hash_function_2
+from capacity_policy import POWER_OF_TWO, PRIME, check_policy
+
+
+class _Table:
+    """
+    Buckets and their capacity, published together so a reader never pairs
+    the buckets of one table with the capacity of another
+    """
+
+    __slots__ = ('buckets', 'capacity')
+
+    def __init__(self, capacity: int) -> None:
+        self.capacity = capacity
+        self.buckets = DynamicArray()
+        for _ in range(capacity):
+            self.buckets.append(LinkedList())
+
+
+class HashMap:
+
+    # Capacity and hashing work exactly as in the chaining map
+    _next_prime = hash_map_sc.HashMap._next_prime
+    _is_prime = staticmethod(hash_map_sc.HashMap._is_prime)
+    _next_capacity = hash_map_sc.HashMap._next_capacity
+    _hash = hash_map_sc.HashMap._hash
+    _hash_keys = hash_map_sc.HashMap._hash_keys
+
+    def __init__(self,
+                 capacity: int = 11,
+                 function: callable = hash_function_1,
+                 capacity_policy: str = PRIME,
+                 stripes: int = 16) -> None:
+        """
+        Initialize new thread-safe HashMap that uses separate chaining for
+          collision resolution, with writers locking one of stripes locks.
+        capacity_policy is one of the policies in capacity_policy.py
+        """
+        if stripes < 1:
+            raise ValueError("stripes must be at least 1")
+
+        check_policy(capacity_policy)
+        self._capacity_policy = capacity_policy
+        self._power_of_two = capacity_policy == POWER_OF_TWO
+        self._hash_function = function
+
+        self._table = _Table(self._next_capacity(capacity))
+
+        # Entries and non-empty buckets are counted per stripe, under that
+        # stripe's lock
+        self._locks = [threading.Lock() for _ in range(stripes)]
+        self._sizes = [0] * stripes
+        self._occupied = [0] * stripes
+
+    def __str__(self) -> str:
+        """
+        Override string method to provide more readable output.
+        """
+        table = self._table
+        out = ''
+        for i in range(table.capacity):
+            out += str(i) + ': ' + str(table.buckets[i]) + '\n'
+        return out
+
+    def _table_index(self, table: _Table, hash: int) -> int:
+        """
+        Returns the bucket index for a full hash in table.
+        """
+        if self._power_of_two:
+            return hash & (table.capacity - 1)
+        return hash % table.capacity
+
+    def _stripe(self, table: _Table, idx: int) -> int:
+        """
+        Returns the stripe whose lock covers bucket idx of table.
+        """
+        return idx * len(self._locks) // table.capacity
+
+    def _lock_bucket(self, hash: int) -> tuple[_Table, int, int]:
+        """
+        Locks the stripe covering the bucket for hash in the current table,
+          returning the table, bucket index and stripe. Tries again if the
+          table is replaced while waiting for the lock.
+        """
+        while True:
+            table = self._table
+            idx = self._table_index(table, hash)
+            stripe = self._stripe(table, idx)
+            self._locks[stripe].acquire()
+            if table is self._table:
+                return table, idx, stripe
+            self._locks[stripe].release()
+
+    def _lock_all(self) -> None:
+        """
+        Locks every stripe, always in the same order so that two threads
+          doing this cannot deadlock.
+        """
+        for lock in self._locks:
+            lock.acquire()
+
+    def _unlock_all(self) -> None:
+        """
+        Unlocks every stripe.
+        """
+        for lock in self._locks:
+            lock.release()
+
+    def get_size(self) -> int:
+        """
+        Return size of map
+        """
+        return sum(self._sizes)
+
+    def get_capacity(self) -> int:
+        """
+        Return capacity of map
+        """
+        return self._table.capacity
+
+    # ------------------------------------------------------------------ #
+
+    def put(self, key: str, value: object) -> None:
+        """
+        Adds a new key-value pair, or updates the value of an existing key.
+          Grows the table once the load reaches 1.
+        """
+        self._put_hashed(key, value, self._hash(key))
+
+    def _put_hashed(self, key: str, value: object, hash: int) -> None:
+        """
+        Does the work of put given the already computed hash of key.
+        """
+        table, idx, stripe = self._lock_bucket(hash)
+        try:
+            bucket = table.buckets[idx]
+            node = bucket.contains(key, hash)
+            if node:
+                node.value = value
+                return
+
+            if bucket.length() == 0:
+                self._occupied[stripe] += 1
+            bucket.insert(key, value, hash)
+            self._sizes[stripe] += 1
+        finally:
+            self._locks[stripe].release()
+
+        if self.get_size() >= table.capacity:
+            self._rehash(table.capacity * 2, table)
+
+    def resize_table(self, new_capacity: int) -> None:
+        """
+        Resizes the table to the next capacity from new_capacity that keeps
+          the load below 1. Readers are not blocked while it runs.
+        """
+        if new_capacity >= 1:
+            self._rehash(new_capacity)
+
+    def _rehash(self, new_capacity: int, expected: _Table = None) -> None:
+        """
+        Copies every entry into a new table and publishes it. If expected is
+          given, nothing is done unless it is still the current table, so
+          that threads that all saw the same full table only grow it once.
+        """
+        self._lock_all()
+        try:
+            if expected is not None and self._table is not expected:
+                return
+
+            old_table = self._table
+            size = self.get_size()
+            capacity = self._next_capacity(new_capacity)
+            while size / capacity >= 1:
+                capacity = self._next_capacity(capacity * 2)
+
+            # Copy the nodes rather than moving them, so readers still
+            # walking the old table see it unchanged
+            table = _Table(capacity)
+            sizes = [0] * len(self._locks)
+            occupied = [0] * len(self._locks)
+            for bucket_idx in range(old_table.capacity):
+                node = old_table.buckets[bucket_idx]._head
+                while node:
+                    idx = self._table_index(table, node.hash)
+                    stripe = self._stripe(table, idx)
+                    if table.buckets[idx].length() == 0:
+                        occupied[stripe] += 1
+                    table.buckets[idx].insert(node.key, node.value, node.hash)
+                    sizes[stripe] += 1
+                    node = node.next
+
+            self._sizes = sizes
+            self._occupied = occupied
+            self._table = table
+        finally:
+            self._unlock_all()
+
+    def table_load(self) -> float:
+        """
+        Returns the load factor of the table.
+        """
+        table = self._table
+        return self.get_size() / table.capacity
+
+    def empty_buckets(self) -> int:
+        """
+        Returns the number of empty buckets in the hash map.
+        """
+        table = self._table
+        return table.capacity - sum(self._occupied)
+
+    def get(self, key: str) -> object:
+        """
+        Returns the value assigned to key, or None if the key is not in the
+          hash map. Takes no locks.
+        """
+        return self._get_hashed(key, self._hash(key))
+
+    def _get_hashed(self, key: str, hash: int) -> object:
+        """
+        Does the work of get given the already computed hash of key.
+        """
+        table = self._table
+        node = table.buckets[self._table_index(table, hash)].contains(key,
+                                                                      hash)
+        if node:
+            return node.value
+        return None
+
+    def contains_key(self, key: str) -> bool:
+        """
+        Returns whether key is in the hash map. Takes no locks.
+        """
+        hash = self._hash(key)
+        table = self._table
+        idx = self._table_index(table, hash)
+        return table.buckets[idx].contains(key, hash) is not None
+
+    def remove(self, key: str) -> None:
+        """
+        Removes key and its value from the hash map, if it is there.
+        """
+        self._remove_hashed(key, self._hash(key))
+
+    def _remove_hashed(self, key: str, hash: int) -> None:
+        """
+        Does the work of remove given the already computed hash of key.
+        """
+        table, idx, stripe = self._lock_bucket(hash)
+        try:
+            bucket = table.buckets[idx]
+            if bucket.remove(key, hash):
+                self._sizes[stripe] -= 1
+                if bucket.length() == 0:
+                    self._occupied[stripe] -= 1
+        finally:
+            self._locks[stripe].release()
+
+    def put_many(self, pairs) -> None:
+        """
+        Adds every (key, value) tuple in pairs (a list or DynamicArray) to
+          the hash map, hashing the keys as one batch.
+        """
+        if isinstance(pairs, DynamicArray):
+            pairs = [pairs[idx] for idx in range(pairs.length())]
+        hashes = self._hash_keys([pair[0] for pair in pairs])
+
+        # Grow once up front to fit every key, as the chaining map does
+        size = self.get_size()
+        if size + len(pairs) >= self.get_capacity():
+            self.resize_table(size + len(pairs) + 1)
+
+        for idx in range(len(pairs)):
+            self._put_hashed(pairs[idx][0], pairs[idx][1], hashes[idx])
+
+    def get_many(self, keys) -> DynamicArray:
+        """
+        Returns a DynamicArray with the value of each key in keys (a list or
+          DynamicArray), or None for keys that are not in the hash map.
+        """
+        if isinstance(keys, DynamicArray):
+            keys = [keys[idx] for idx in range(keys.length())]
+        hashes = self._hash_keys(keys)
+
+        values = DynamicArray()
+        for idx in range(len(keys)):
+            values.append(self._get_hashed(keys[idx], hashes[idx]))
+        return values
+
+    def remove_many(self, keys) -> None:
+        """
+        Removes each key in keys (a list or DynamicArray) from the hash map.
+        """
+        if isinstance(keys, DynamicArray):
+            keys = [keys[idx] for idx in range(keys.length())]
+        hashes = self._hash_keys(keys)
+
+        for idx in range(len(keys)):
+            self._remove_hashed(keys[idx], hashes[idx])
+
+    def get_keys_and_values(self) -> DynamicArray:
+        """
+        Returns a DynamicArray with a tuple for each key-value pair. Takes no
+          locks, so entries changed while it runs may or may not be seen.
+        """
+        table = self._table
+        keys_and_values = DynamicArray()
+        for bucket_idx in range(table.capacity):
+            node = table.buckets[bucket_idx]._head
+            while node:
+                keys_and_values.append((node.key, node.value))
+                node = node.next
+        return keys_and_values
+
+    def clear(self) -> None:
+        """
+        Clears the contents of the hash map (without changing capacity.)
+        """
+        self._lock_all()
+        try:
+            self._table = _Table(self._table.capacity)
+            self._sizes = [0] * len(self._locks)
+            self._occupied = [0] * len(self._locks)
+        finally:
+            self._unlock_all()
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+
+if __name__ == "__main__":
+
+    print("\nConcurrent - threaded put example")
+    print("---------------------------------")
+    m = HashMap(11, hash_function_2)
+
+    def put_range(start: int) -> None:
+        for i in range(start, start + 250):
+            m.put('str' + str(i), i)
+
+    threads = [threading.Thread(target=put_range, args=(start,))
+               for start in range(0, 1000, 250)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    print(m.get_size(), m.get_capacity(), round(m.table_load(), 2))
+    print(all(m.get('str' + str(i)) == i for i in range(1000)))
@@ -0,0 +1,121 @@
+# Name: Tom Haney
+# Course: CS261 - Data Structures
+# Description: Implementation for an open addressing Hash Map specialized for
+#  integer keys. It is the struct of arrays map (hash_map_soa) with the keys
+#  themselves stored in an array('q') next to their hashes, so the table
+#  holds no key objects at all, and with keys hashed by the fmix64 integer
+#  mixer instead of converting them to strings and hashing those one
+#  character at a time. Keys must fit in a signed 64-bit integer.
+
+import time
+from array import array
+
+import hash_map_soa
+from capacity_policy import PRIME, fmix64
+from hash_map_soa import _HASH_MASK, DELETED
+
+
+_MASK_64 = (1 << 64) - 1
+
+_KEY_MIN = -(1 << 63)
+_KEY_MAX = (1 << 63) - 1
+
+
+def hash_int(key: int) -> int:
+    """
+    Mixes all 64 bits of an integer key into a 64-bit hash (fmix64, the
+      MurmurHash3 finalizer), so that sequential or strided keys spread
+      over every bucket of prime and power of two tables alike.
+    """
+    return fmix64(key & _MASK_64)
+
+
+class HashMap(hash_map_soa.HashMap):
+    def __init__(self, capacity: int, function=hash_int,
+                 capacity_policy: str = PRIME,
+                 shrink_load: float = 0.0,
+                 bloom_fp_rate: float = None,
+                 clock: callable = time.monotonic) -> None:
+        """
+        Initialize new HashMap for integer keys that uses quadratic probing
+          for collision resolution. function hashes an int key, and is
+          hash_int unless given.
+        """
+        super().__init__(capacity, function, capacity_policy, shrink_load,
+                         bloom_fp_rate, clock)
+
+    def _reset_buckets(self) -> None:
+        """
+        Replaces the table with self._capacity empty slots, keys included
+          in a typed array.
+        """
+        super()._reset_buckets()
+        self._keys = array('q', bytes(8 * self._capacity))
+
+    def _hash(self, key: int) -> int:
+        """
+        Returns the full hash of key, cut down to 63 bits. hash_int already
+          mixes every bit, so power of two tables do not mix it again.
+        """
+        if self._hash_function is hash_int:
+            return hash_int(key) & _HASH_MASK
+        return super()._hash(key)
+
+    def _hash_keys(self, keys: list) -> list:
+        """
+        Returns the full hash of each key in keys, cut down to 63 bits.
+        """
+        return [self._hash(key) for key in keys]
+
+    def _put_hashed(self, key: int, value: object, hash: int) -> None:
+        """
+        Does the work of put given the already computed hash of key. Keys
+          that do not fit in the typed array are refused before anything in
+          the table changes.
+        """
+        if not _KEY_MIN <= key <= _KEY_MAX:
+            raise ValueError("keys must fit in a signed 64-bit integer")
+        super()._put_hashed(key, value, hash)
+
+    def _remove_hashed(self, key: int, hash: int) -> None:
+        """
+        Removes the matching key-value pair by marking its slot deleted. The
+          key stays in the typed array until the slot is reused.
+        """
+        idx = self._find(key, hash)
+        if idx >= 0:
+            self._states[idx] = DELETED
+            self._values[idx] = None
+            self._size -= 1
+            self._tombstones += 1
+
+    def save(self, path: str) -> None:
+        """
+        Not supported: the snapshot format stores str keys, so an int keyed
+          map cannot be written to one.
+        """
+        raise TypeError("snapshots hold str keys only, so an int keyed "
+                        "HashMap cannot be saved")
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+
+if __name__ == "__main__":
+
+    print("\nInteger keys - put example")
+    print("--------------------------")
+    m = HashMap(53)
+    for i in range(150):
+        m.put(i * 1000003, i * 100)
+        if i % 25 == 24:
+            print(m.empty_buckets(), round(m.table_load(), 2), m.get_size(), m.get_capacity())
+
+    print("\nInteger keys - get and remove example")
+    print("-------------------------------------")
+    m = HashMap(11)
+    for i in range(-5, 5):
+        m.put(i, str(i))
+    m.remove(0)
+    print(m.get(-5), m.get(4), m.get(0), m.contains_key(0), m.get_size())
+    print(m.get_keys_and_values())
@@ -7,27 +7,76 @@
 #  addressing. Also allows for iteration over the hash map. Uses quadratic
 #  probing to find open addresses.
 
-from a6_include import (DynamicArray, DynamicArrayException, HashEntry,
+import time
+
+from a6_include import (DynamicArray, HashEntry,
                         hash_function_1, hash_function_2)
+from bloom_filter import CountingBloomFilter
+from map_features import MapFeatures
+from capacity_policy import (POWER_OF_TWO, PRIME, PRIME_TABLE, check_policy,
+                             fmix64, next_power_of_two, table_prime)
+from hash_batch import group_by_bucket, hash_batch
 
 
-class HashMap:
-    def __init__(self, capacity: int, function) -> None:
+class HashMap(MapFeatures):
+    def __init__(self, capacity: int, function,
+                 capacity_policy: str = PRIME,
+                 shrink_load: float = 0.0,
+                 bloom_fp_rate: float = None,
+                 clock: callable = time.monotonic) -> None:
         """
         Initialize new HashMap that uses
         quadratic probing for collision resolution
-        DO NOT CHANGE THIS METHOD IN ANY WAY
-        """
+        capacity_policy is one of the policies in capacity_policy.py
+        If shrink_load is above 0, a remove that drops the load below it
+        shrinks the table so the load is back at half the growth threshold
+        (as after growing), but never below the starting capacity. It must
+        be below that half, so a shrink is never followed straight away by
+        a grow.
+        If bloom_fp_rate is given, a counting Bloom filter of every key's
+        hash is kept alongside the table, so that get, contains_key and
+        remove of a key that is definitely absent return before probing.
+        It is sized for a full table to give about that false positive
+        rate, and is rebuilt whenever the table is resized.
+        clock is the time source, in seconds, that ttl expiry goes by.
+        """
+        if not 0 <= shrink_load < self._grow_load() / 2:
+            raise ValueError("shrink_load must be at least 0 and below "
+                             f"{self._grow_load() / 2}")
         self._buckets = DynamicArray()
 
-        # capacity must be a prime number
-        self._capacity = self._next_prime(capacity)
-        for _ in range(self._capacity):
-            self._buckets.append(None)
+        # capacity is a prime number unless using power of two capacities
+        check_policy(capacity_policy)
+        self._capacity_policy = capacity_policy
+        self._power_of_two = capacity_policy == POWER_OF_TWO
+        self._capacity = self._next_capacity(capacity)
+        self._reset_buckets()
+
+        # Low-water mark, and the capacity shrinking stops at
+        self._shrink_load = shrink_load
+        self._min_capacity = self._capacity
 
         self._hash_function = function
         self._size = 0
 
+        # Removed entries still occupy their slot until the next rehash
+        self._tombstones = 0
+
+        # MapStats while stats are enabled (see map_stats.py)
+        self._stats = None
+
+        # Expiry of keys put with a ttl: a timing wheel of their timers,
+        # and an open addressing map from each such key to its timer. Both
+        # are only made by the first put with a ttl.
+        self._clock = clock
+        self._wheel = None
+        self._timers = None
+
+        # Bloom filter of the hashes of every key, if one is kept
+        self._bloom_fp_rate = bloom_fp_rate
+        self._bloom = None
+        self._rebuild_bloom()
+
     def __str__(self) -> str:
         """
         Override string method to provide more readable output
@@ -71,6 +120,56 @@ class HashMap:
 
         return True
 
+    def _next_capacity(self, capacity: int) -> int:
+        """
+        Returns the capacity to use for the requested capacity, according to
+          the capacity policy of the map.
+        """
+        if self._power_of_two:
+            return next_power_of_two(capacity)
+        if self._capacity_policy == PRIME_TABLE:
+            prime = table_prime(capacity)
+            if prime is not None:
+                return prime
+        return self._next_prime(capacity)
+
+    def _hash(self, key: str) -> int:
+        """
+        Returns the full hash of key as stored in its entry. Power of two
+          tables only index with the low bits, so the hash is mixed first.
+        """
+        if self._power_of_two:
+            return fmix64(self._hash_function(key))
+        return self._hash_function(key)
+
+    def _hash_keys(self, keys: list) -> list:
+        """
+        Returns the full hash of each key in keys, hashed as one batch.
+        """
+        hashes = hash_batch(keys, self._hash_function)
+        if self._power_of_two:
+            hashes = [fmix64(hash) for hash in hashes]
+        return hashes
+
+    def _bucket_index(self, hash: int) -> int:
+        """
+        Returns the initial bucket index for a full hash.
+        """
+        if self._power_of_two:
+            return hash & (self._capacity - 1)
+        return hash % self._capacity
+
+    def _probe(self, start_idx: int, quad: int) -> int:
+        """
+        Returns the quad-th index of the quadratic probe sequence that
+          starts at start_idx. Power of two tables use triangular offsets,
+          which (unlike squares) visit every slot of such a table.
+        """
+        if self._power_of_two:
+            return ((start_idx + (quad * quad + quad) // 2) &
+                    (self._capacity - 1))
+        return (start_idx + (quad * quad)) % self._capacity
+
     def get_size(self) -> int:
         """
         Return size of map
@@ -85,39 +184,123 @@ class HashMap:
         """
         return self._capacity
 
+    def get_tombstones(self) -> int:
+        """
+        Return number of tombstones (removed entries) held in the table
+        """
+        return self._tombstones
+
     # ------------------------------------------------------------------ #
 
-    def put(self, key: str, value: object) -> None:
+    def put(self, key: str, value: object, ttl: float = None) -> None:
         """
         Inserts a new key-value pair into the hash map. Accounts for
           resizing of the table if the load exceeds 0.5. Utilizes quadratic
           probing to find the next insertion index. Overwrites an existing
           value with a matching key to the new value.
+        If ttl is given, the key expires ttl seconds from now (to within a
+          tick of the timing wheel), after which it is treated as a miss.
+          A put without ttl keeps the key for good again.
         """
-        # Resize the table if load exceeds .5
-        if self.table_load() >= 0.5:
-            self.resize_table(self._capacity * 2)
+        if ttl is not None and ttl <= 0:
+            raise ValueError("ttl must be above 0")
+
+        hash = self._hash(key)
+        if self._wheel is not None:
+            self._expire()
+
+        if self._bloom is None:
+            self._put_hashed(key, value, hash)
+        else:
+            self._bloom_put(key, value, hash)
+
+        if ttl is not None or self._wheel is not None:
+            self._set_expiry(key, hash, ttl)
+
+    def _put_hashed(self, key: str, value: object, hash: int) -> None:
+        """
+        Does the work of put given the already computed hash of key, so that
+          batch-hashed keys can be inserted without hashing them again.
+        """
+        self._make_room()
 
         # Calculate initial insertion index
-        idx = self._hash_function(key) % self._capacity
+        idx = self._bucket_index(hash)
         start_idx = idx
 
         # Try different indices via quadratic probing until we find an open
-        # index or a tombstone to insert
+        # index or the key itself. The first tombstone passed is remembered
+        # so it can be reused once we know the key is absent.
+        reuse_idx = -1
         quad = 1
-        while (self._buckets[idx] and
-               not self._buckets[idx].is_tombstone and
-               not self._buckets[idx].key == key):
-            idx = (start_idx + (quad * quad)) % self._capacity
+        while self._buckets[idx]:
+            entry = self._buckets[idx]
+            if entry.is_tombstone:
+                if reuse_idx < 0:
+                    reuse_idx = idx
+            elif entry.hash == hash and entry.key == key:
+                # Simply update value if key already exists
+                entry.value = value
+                return
+            idx = self._probe(start_idx, quad)
             quad += 1
 
-        if self._buckets[idx] and self._buckets[idx].key == key:
-            # Simply update value if key already exists
-            self._buckets[idx].value = value
-        else:
-            # Insert and update size otherwise
-            self._buckets[idx] = HashEntry(key, value)
-            self._size += 1
+        # Insert and update size otherwise
+        if reuse_idx >= 0:
+            idx = reuse_idx
+            self._tombstones -= 1
+        self._buckets[idx] = HashEntry(key, value, hash)
+        self._size += 1
+
+    def _make_room(self) -> None:
+        """
+        Resizes the table if one more entry would leave the used slots (live
+          entries and tombstones) at half the capacity or more. Quadratic
+          probing of a prime table p only visits (p + 1) / 2 slots, so the
+          used slots must stay strictly below that for every probe to be
+          sure of reaching an empty slot.
+        """
+        if (self._size + self._tombstones + 1) * 2 > self._capacity:
+            if self._tombstones * 4 > self._size + self._tombstones:
+                # Over a quarter of the used slots are dead, so just compact
+                # them away at the same capacity instead of growing
+                self.resize_table(self._capacity)
+            if (self._size + 1) * 2 > self._capacity:
+                self.resize_table(self._capacity * 2)
+
+    def _grow_load(self) -> float:
+        """
+        Returns the load at which the table grows.
+        """
+        return 0.5
+
+    def _placement_order(self, hashes: list) -> tuple[list, list]:
+        """
+        Returns the initial index of each hash in the current table, and the
+          order to place them in. The indices are computed in one vectorized
+          pass and sorted if possible, so each stretch of the table is
+          filled in one go; otherwise they are placed in the order given.
+        """
+        groups = group_by_bucket(hashes, self._capacity, self._power_of_two)
+        if groups is None:
+            starts = [self._bucket_index(hash) for hash in hashes]
+            return starts, range(len(hashes))
+        return groups
+
+    def _capacity_for(self, count: int) -> int:
+        """
+        Returns the smallest capacity that holds count entries without
+          needing to grow.
+        """
+        return 2 * count + 1
+
+    def _reset_buckets(self) -> None:
+        """
+        Replaces the table with self._capacity empty buckets.
+        """
+        self._buckets = DynamicArray()
+        for _ in range(self._capacity):
+            self._buckets.append(None)
 
     def resize_table(self, new_capacity: int) -> None:
         """
@@ -131,39 +314,44 @@ class HashMap:
         # values held
         if new_capacity >= self._size:
 
-            # Get the old data for re-insertion
-            old_data = self.get_keys_and_values()
+            # Keep the old buckets so their entries can be re-inserted
+            old_buckets = self._buckets
 
             # Resize until table load is less than 0.5
-            self._capacity = self._next_prime(new_capacity)
+            self._capacity = self._next_capacity(new_capacity)
 
             while self.table_load() >= 0.5:
                 new_capacity = self._capacity * 2
-                self._capacity = self._next_prime(new_capacity)
+                self._capacity = self._next_capacity(new_capacity)
 
             # Reset the buckets
-            self._buckets = DynamicArray()
-            for _ in range(self._capacity):
-                self._buckets.append(None)
-
-            # Re-hash and replace the old data
-            for idx in range(old_data.length()):
-                old_key = old_data[idx][0]
-                old_value = old_data[idx][1]
-
-                # Calculate initial insertion index
-                idx = self._hash_function(old_key) % self._capacity
+            self._reset_buckets()
+
+            # Re-place the old entries using their cached hashes, in order
+            # of initial index
+            entries = list(self._entries_of(old_buckets))
+            starts, order = self._placement_order(
+                [entry.hash for entry in entries])
+            for pos in order:
+                entry = entries[pos]
+
+                # Initial insertion index
+                idx = starts[pos]
                 start_idx = idx
 
                 # Try different indices via quadratic probing until we
                 # find an open index to insert
                 quad = 1
                 while self._buckets[idx]:
-                    idx = (start_idx + (quad * quad)) % self._capacity
+                    idx = self._probe(start_idx, quad)
                     quad += 1
 
-                # Insert
-                self._buckets[idx] = HashEntry(old_key, old_value)
+                # Insert (the live entry object is simply moved over)
+                self._buckets[idx] = entry
+
+            # Tombstones are not carried over
+            self._tombstones = 0
+            self._rebuild_bloom()
 
 
     def table_load(self) -> float:
@@ -174,9 +362,17 @@ class HashMap:
 
     def empty_buckets(self) -> int:
         """
-        Returns the number of empty buckets in the hash map.
+        Returns the number of empty buckets in the hash map. Tombstones
+          still occupy their bucket, so they are not counted as empty.
         """
-        return self._capacity - self._size
+        return self._capacity - self._occupied_buckets()
+
+    def _occupied_buckets(self) -> int:
+        """
+        Returns the number of buckets holding a live entry or a tombstone,
+          from the size and tombstone counters.
+        """
+        return self._size + self._tombstones
 
 
     def get(self, key: str) -> object:
@@ -184,60 +380,174 @@ class HashMap:
         Returns the value associated with key, unless that key is not in
           the hash map. In this case, None is returned.
         """
+        hash = self._hash(key)
+        if self._wheel is not None:
+            self._expire()
+        if self._bloom is not None and not self._bloom.might_contain(hash):
+            return None
+        return self._get_hashed(key, hash)
 
-        search_idx = self._hash_function(key) % self._capacity
+    def _get_hashed(self, key: str, hash: int) -> object:
+        """
+        Does the work of get given the already computed hash of key.
+        """
+        # Return the value of the associated key if found, or None otherwise
+        search_idx = self._find(key, hash)
+        if search_idx >= 0:
+            return self._buckets[search_idx].value
+        return None
+
+    def _find(self, key: str, hash: int) -> int:
+        """
+        Returns the index of the live entry holding key, or -1 if the key is
+          not in the hash map.
+        """
+        search_idx = self._bucket_index(hash)
         start_idx = search_idx
 
-        # Try different indices via quadratic probing until we
-        # reach an open index or find a matching key
+        # Try different indices via quadratic probing until we reach an
+        # open index or find a matching key, probing past tombstones
         quad = 1
-        while (self._buckets[search_idx] and
-               not self._buckets[search_idx].is_tombstone and
-               not self._buckets[search_idx].key == key):
-            search_idx = (start_idx +
-                          (quad * quad)) % self._capacity
+        while self._buckets[search_idx]:
+            entry = self._buckets[search_idx]
+            if (not entry.is_tombstone and entry.hash == hash and
+                    entry.key == key):
+                return search_idx
+            search_idx = self._probe(start_idx, quad)
             quad += 1
 
-        # Return the value of the associated key if found, or None otherwise
-        if (self._buckets[search_idx] and
-            not self._buckets[search_idx].is_tombstone and
-            self._buckets[search_idx].key == key):
-            return self._buckets[search_idx].value
-        return None
-
+        return -1
 
     def contains_key(self, key: str) -> bool:
         """
-        Simply calls the get method to search for a key within the table,
-          returning true if it is found and false otherwise.
+        Searches for a key within the table, returning true if it is found
+          and false otherwise.
         """
-        if self.get(key) is not None:
-            return True
-        return False
+        hash = self._hash(key)
+        if self._wheel is not None:
+            self._expire()
+        if self._bloom is not None and not self._bloom.might_contain(hash):
+            return False
+        return self._find(key, hash) >= 0
 
     def remove(self, key: str) -> None:
         """
         Removes the matching key-value pair from the hash map by setting it to
           a tombstone.
         """
-        search_idx = self._hash_function(key) % self._capacity
-        start_idx = search_idx
-
-        # Try different indices via quadratic probing until we
-        # reach an open index or find a matching key
-        quad = 1
-        while (self._buckets[search_idx] and
-               not self._buckets[search_idx].key == key):
-            search_idx = (start_idx +
-                          (quad * quad)) % self._capacity
-            quad += 1
+        hash = self._hash(key)
+        if self._wheel is not None:
+            self._expire()
+        if self._bloom is None and self._wheel is None:
+            self._remove_hashed(key, hash)
+        elif self._bloom is None or self._bloom.might_contain(hash):
+            self._remove_key(key, hash)
+        self._maybe_shrink()
 
+    def _remove_hashed(self, key: str, hash: int) -> None:
+        """
+        Does the work of remove given the already computed hash of key.
+        """
         # Set to tombstone if found
-        if (self._buckets[search_idx] and
-            self._buckets[search_idx].key == key and
-            not self._buckets[search_idx].is_tombstone):
+        search_idx = self._find(key, hash)
+        if search_idx >= 0:
             self._buckets[search_idx].is_tombstone = True
             self._size -= 1
+            self._tombstones += 1
+
+    def put_many(self, pairs, ttl: float = None) -> None:
+        """
+        Adds every (key, value) tuple in pairs (a list or DynamicArray) to
+          the hash map. The keys are hashed as one batch, and the table is
+          resized at most once, up front, to fit all of them. ttl applies
+          to every key, as in put.
+        """
+        if ttl is not None and ttl <= 0:
+            raise ValueError("ttl must be above 0")
+
+        if isinstance(pairs, DynamicArray):
+            pairs = [pairs[idx] for idx in range(pairs.length())]
+        hashes = self._hash_keys([pair[0] for pair in pairs])
+        if self._wheel is not None:
+            self._expire()
+
+        # Size the table for every key being new. Tombstones are dropped by
+        # the resize, but until then they take up room as well.
+        used = self._size + self._tombstones + len(pairs)
+        if self._capacity < self._capacity_for(used):
+            self.resize_table(self._capacity_for(self._size + len(pairs)))
+
+        put = self._put_hashed if self._bloom is None else self._bloom_put
+        expiring = ttl is not None or self._wheel is not None
+        for idx in range(len(pairs)):
+            put(pairs[idx][0], pairs[idx][1], hashes[idx])
+            if expiring:
+                self._set_expiry(pairs[idx][0], hashes[idx], ttl)
+
+    def get_many(self, keys) -> DynamicArray:
+        """
+        Returns a DynamicArray with the value of each key in keys (a list or
+          DynamicArray), or None for keys that are not in the hash map.
+        """
+        if isinstance(keys, DynamicArray):
+            keys = [keys[idx] for idx in range(keys.length())]
+        hashes = self._hash_keys(keys)
+        if self._wheel is not None:
+            self._expire()
+
+        bloom = self._bloom
+        values = DynamicArray()
+        for idx in range(len(keys)):
+            if bloom is not None and not bloom.might_contain(hashes[idx]):
+                values.append(None)
+            else:
+                values.append(self._get_hashed(keys[idx], hashes[idx]))
+        return values
+
+    def remove_many(self, keys) -> None:
+        """
+        Removes each key in keys (a list or DynamicArray) from the hash map.
+        """
+        if isinstance(keys, DynamicArray):
+            keys = [keys[idx] for idx in range(keys.length())]
+        hashes = self._hash_keys(keys)
+
+        if self._wheel is not None:
+            self._expire()
+
+        remove = (self._remove_hashed
+                  if self._bloom is None and self._wheel is None
+                  else self._remove_key)
+        for idx in range(len(keys)):
+            remove(keys[idx], hashes[idx])
+
+        # Shrink once at the end, rather than once per halving
+        self._maybe_shrink()
+
+    def _rebuild_bloom(self) -> None:
+        """
+        Replaces the Bloom filter, if one is kept, with one sized for the
+          current capacity and holding the hash of every key.
+        """
+        if self._bloom_fp_rate is None:
+            return
+        expected = max(self._size, int(self._capacity * self._grow_load()))
+        bloom = CountingBloomFilter(expected, self._bloom_fp_rate)
+        for entry in self._entries():
+            bloom.add(entry.hash)
+        self._bloom = bloom
+
+    def _maybe_shrink(self) -> None:
+        """
+        Shrinks the table if the load has dropped below the low-water mark,
+          to the capacity that brings the load back up to half the growth
+          threshold. Tombstones are dropped along the way.
+        """
+        if self._size < self._shrink_load * self._capacity:
+            capacity = max(self._next_capacity(
+                self._capacity_for(2 * self._size)), self._min_capacity)
+            if capacity < self._capacity:
+                self.resize_table(capacity)
 
     def get_keys_and_values(self) -> DynamicArray:
         """
@@ -246,51 +556,93 @@ class HashMap:
         keys_and_values = DynamicArray()
 
         # Place each key-value pair in the return array
-        for idx in range(self._buckets.length()):
-            # Make sure not None or tombstone value
-            if self._buckets[idx] and not self._buckets[idx].is_tombstone:
-                pair = (self._buckets[idx].key, self._buckets[idx].value)
-                keys_and_values.append(pair)
+        for pair in self.items():
+            keys_and_values.append(pair)
 
         return keys_and_values
 
+    def _entries(self):
+        """
+        Generator over the live entries, skipping tombstones and None
+          values.
+        """
+        return self._entries_of(self._buckets)
+
+    @staticmethod
+    def _entries_of(buckets: DynamicArray):
+        """
+        Generator over the live entries in buckets.
+        """
+        for idx in range(buckets.length()):
+            entry = buckets[idx]
+            if entry and not entry.is_tombstone:
+                yield entry
 
     def clear(self) -> None:
         """
-        Clears the hash map, removing all key value pairs.
+        Clears the hash map, removing all key value pairs. With shrinking
+          on, the table also goes back to its starting capacity.
         """
-        # Create a new DynamicArray for buckets and append None to each
-        self._buckets = DynamicArray()
-        for _ in range(self._capacity):
-            self._buckets.append(None)
+        if self._shrink_load:
+            self._capacity = self._min_capacity
 
-        # Reset size to 0
+        # Create a new DynamicArray for buckets with None in each
+        self._reset_buckets()
+
+        # Reset size and tombstones to 0
         self._size = 0
+        self._tombstones = 0
+        self._wheel = None
+        self._timers = None
+        self._rebuild_bloom()
 
-    def __iter__(self):
+    def save(self, path: str) -> None:
+        """
+        Writes the hash map to a snapshot file at path, which open_mmap in
+          hash_map_snapshot.py serves lookups from without loading it.
         """
-        Initializes a private variable index to be used with an iterator.
+        # Imported here, as hash_map_snapshot imports this module
+        import hash_map_snapshot
+        if self._wheel is not None:
+            self._expire()
+        hash_map_snapshot.save(self, path)
+
+    def _probe_length(self, key: str, hash: int) -> tuple[int, bool]:
+        """
+        Returns how many occupied slots (tombstones included) a lookup of
+          key looks at, and whether it finds key. Only used for statistics.
         """
-        self._index = 0
-        return self
+        idx = self._bucket_index(hash)
+        start_idx = idx
 
-    def __next__(self):
+        length = 0
+        quad = 1
+        while self._buckets[idx]:
+            length += 1
+            entry = self._buckets[idx]
+            if (not entry.is_tombstone and entry.hash == hash and
+                    entry.key == key):
+                return length, True
+            idx = self._probe(start_idx, quad)
+            quad += 1
+        return length, False
+
+    def _chain_lengths(self) -> list:
         """
-        Proceeds to the next valid value in the hash map, skipping tombstones
-          and None values. Stops iterating when a DynamicArrayException is
-          raised.
+        Returns the probe length of every live key. Only used for
+          statistics.
         """
-        try:
-            value = self._buckets[self._index]
-            # Make sure not to include tombstones or None
-            while not value or value.is_tombstone:
-                self._index += 1
-                value = self._buckets[self._index]
-        except DynamicArrayException:
-            raise StopIteration
+        return [self._probe_length(entry.key, entry.hash)[0]
+                for entry in self]
 
-        self._index += 1
-        return value
+    def __iter__(self):
+        """
+        Returns a new iterator over the live entries. Each traversal keeps
+          its own place, so traversals can be nested or interleaved.
+        """
+        if self._wheel is not None:
+            self._expire()
+        return self._entries()
 
 
 # ------------------- BASIC TESTING ---------------------------------------- #
@@ -0,0 +1,204 @@
+# Name: Tom Haney
+# Course: CS261 - Data Structures
+# Description: Implementation for a Hash Map data structure using open
+#  addressing with Robin Hood linear probing. On insert, an entry that is
+#  further from its home index than the entry occupying a slot takes that
+#  slot, which keeps probe lengths short and even. Lookups stop as soon as
+#  they pass an entry closer to home than the probe, and removal shifts the
+#  following entries back instead of leaving tombstones, so the table can
+#  run at a much higher load than the quadratic probing map.
+
+import time
+
+import hash_map_oa
+from a6_include import HashEntry, hash_function_1, hash_function_2
+from capacity_policy import PRIME
+
+
+class HashMap(hash_map_oa.HashMap):
+    def __init__(self, capacity: int, function, max_load: float = 0.9,
+                 capacity_policy: str = PRIME,
+                 shrink_load: float = 0.0,
+                 bloom_fp_rate: float = None,
+                 clock: callable = time.monotonic) -> None:
+        """
+        Initialize new HashMap that uses Robin Hood linear probing for
+          collision resolution. The table grows whenever an insert would
+          push the load above max_load, which must be between 0 and 1.
+          shrink_load, bloom_fp_rate and clock work as in hash_map_oa, and
+          shrink_load must be below half of max_load.
+        """
+        if not 0 < max_load < 1:
+            raise ValueError("max_load must be between 0 and 1")
+
+        self._max_load = max_load
+        super().__init__(capacity, function, capacity_policy, shrink_load,
+                         bloom_fp_rate, clock)
+
+    def _probe_distance(self, entry: HashEntry, idx: int) -> int:
+        """
+        Returns how many slots past its home index the entry at idx sits.
+        """
+        return (idx - self._bucket_index(entry.hash)) % self._capacity
+
+    def _find(self, key: str, hash: int) -> int:
+        """
+        Returns the index holding key, or -1 if the key is not in the map.
+        """
+        idx = self._bucket_index(hash)
+        dist = 0
+
+        # Walk forward until an empty slot, or until we reach an entry that
+        # is closer to home than we are (the key would have taken its slot)
+        entry = self._buckets[idx]
+        while entry and self._probe_distance(entry, idx) >= dist:
+            if entry.hash == hash and entry.key == key:
+                return idx
+            idx = (idx + 1) % self._capacity
+            dist += 1
+            entry = self._buckets[idx]
+
+        return -1
+
+    def _probe_length(self, key: str, hash: int) -> tuple[int, bool]:
+        """
+        Returns how many occupied slots a lookup of key looks at, and
+          whether it finds key. Only used for statistics.
+        """
+        idx = self._bucket_index(hash)
+        dist = 0
+
+        entry = self._buckets[idx]
+        while entry and self._probe_distance(entry, idx) >= dist:
+            if entry.hash == hash and entry.key == key:
+                return dist + 1, True
+            idx = (idx + 1) % self._capacity
+            dist += 1
+            entry = self._buckets[idx]
+
+        # The entry that stopped the walk was looked at as well
+        if entry:
+            dist += 1
+        return dist, False
+
+    def _place(self, entry: HashEntry) -> None:
+        """
+        Places an entry whose key is known to be absent, displacing any
+          entries that are closer to their home index along the way.
+        """
+        idx = self._bucket_index(entry.hash)
+        dist = 0
+
+        while self._buckets[idx]:
+            # Swap with the richer entry and carry it forward instead
+            current_dist = self._probe_distance(self._buckets[idx], idx)
+            if current_dist < dist:
+                displaced = self._buckets[idx]
+                self._buckets[idx] = entry
+                entry = displaced
+                dist = current_dist
+
+            idx = (idx + 1) % self._capacity
+            dist += 1
+
+        self._buckets[idx] = entry
+
+    def _grow_load(self) -> float:
+        """
+        Returns the load at which the table grows.
+        """
+        return self._max_load
+
+    def _capacity_for(self, count: int) -> int:
+        """
+        Returns the smallest capacity that holds count entries without
+          needing to grow.
+        """
+        return int(count / self._max_load) + 1
+
+    # ------------------------------------------------------------------ #
+
+    def _put_hashed(self, key: str, value: object, hash: int) -> None:
+        """
+        Inserts a key-value pair, or updates the value of an existing key.
+          Resizes first if the new entry would push the load past max_load.
+        """
+        if self._size + 1 > self._max_load * self._capacity:
+            self.resize_table(self._capacity * 2)
+
+        idx = self._find(key, hash)
+        if idx >= 0:
+            # Simply update value if key already exists
+            self._buckets[idx].value = value
+        else:
+            self._place(HashEntry(key, value, hash))
+            self._size += 1
+
+    def resize_table(self, new_capacity: int) -> None:
+        """
+        Resizes the table to the next prime capacity from new_capacity that
+          keeps the load at or below max_load, then re-places every entry.
+        """
+        if new_capacity >= self._size:
+
+            # Keep the old buckets so their entries can be re-placed
+            old_buckets = self._buckets
+
+            self._capacity = self._next_capacity(new_capacity)
+            while self._size > self._max_load * self._capacity:
+                self._capacity = self._next_capacity(self._capacity * 2)
+
+            self._reset_buckets()
+
+            # Re-place the old entries using their cached hashes
+            for idx in range(old_buckets.length()):
+                if old_buckets[idx]:
+                    self._place(old_buckets[idx])
+
+            self._rebuild_bloom()
+
+    def _remove_hashed(self, key: str, hash: int) -> None:
+        """
+        Removes the matching key-value pair from the hash map, then shifts
+          each following displaced entry back one slot so that no tombstone
+          is left behind.
+        """
+        idx = self._find(key, hash)
+        if idx < 0:
+            return
+
+        # Pull entries back until an empty slot or an entry already at home
+        next_idx = (idx + 1) % self._capacity
+        while (self._buckets[next_idx] and
+               self._probe_distance(self._buckets[next_idx], next_idx) > 0):
+            self._buckets[idx] = self._buckets[next_idx]
+            idx = next_idx
+            next_idx = (next_idx + 1) % self._capacity
+
+        self._buckets[idx] = None
+        self._size -= 1
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+
+if __name__ == "__main__":
+
+    print("\nRobin Hood - put at high load")
+    print("-----------------------------")
+    m = HashMap(53, hash_function_1)
+    for i in range(150):
+        m.put('str' + str(i), i * 100)
+        if i % 25 == 24:
+            print(m.empty_buckets(), round(m.table_load(), 2), m.get_size(), m.get_capacity())
+
+    print("\nRobin Hood - remove leaves no tombstones")
+    print("----------------------------------------")
+    m = HashMap(11, hash_function_2)
+    for i in range(8):
+        m.put(str(i), str(i * 10))
+    m.remove('0')
+    m.remove('4')
+    print(m)
+    for item in m:
+        print('K:', item.key, 'V:', item.value)
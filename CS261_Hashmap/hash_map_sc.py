@@ -5,30 +5,151 @@
 # Due Date: 06Aug25
 # Description: Implementation for a Hash Map data structure using chaining.
 
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
 
-from a6_include import (DynamicArray, LinkedList,
-                        hash_function_1, hash_function_2)
+from a6_include import (MOVE_TO_FRONT, TRANSPOSE, DynamicArray, LinkedList,
+                        LRUNode, hash_function_1, hash_function_2)
+from bloom_filter import CountingBloomFilter
+from map_features import MapFeatures
+from capacity_policy import (POWER_OF_TWO, PRIME, PRIME_TABLE, check_policy,
+                             fmix64, next_power_of_two, table_prime)
+from hash_batch import group_by_bucket, hash_batch
+from sorted_bucket import SortedBucket
 
 
-class HashMap:
+# Load at which an incremental resize starts allocating the new buckets, and
+# by which the old buckets must all be migrated after the new ones take over
+_PREPARE_LOAD = 0.75
+
+# Below this many keys find_mode_parallel just runs find_mode, as starting
+# the workers and merging their counts costs more than it saves. Measure
+# the crossover for a machine with bench_find_mode.py.
+PARALLEL_MIN_KEYS = 200000
+
+# The DynamicArray being counted, inherited by forked workers so that each
+# is only sent the bounds of its range
+_fork_input = None
+
+
+class HashMap(MapFeatures):
     def __init__(self,
                  capacity: int = 11,
-                 function: callable = hash_function_1) -> None:
+                 function: callable = hash_function_1,
+                 capacity_policy: str = PRIME,
+                 incremental_resize: int = 0,
+                 chain_policy: str = None,
+                 treeify_threshold: int = 0,
+                 shrink_load: float = 0.0,
+                 bloom_fp_rate: float = None,
+                 max_entries: int = 0,
+                 clock: callable = time.monotonic) -> None:
         """
         Initialize new HashMap that uses
         separate chaining for collision resolution
-        DO NOT CHANGE THIS METHOD IN ANY WAY
+        capacity_policy is one of the policies in capacity_policy.py
+        If incremental_resize is above 0, the table grows a little at a time:
+        once the load reaches 0.75, each put/get/contains_key/remove
+        allocates at least twice that many new buckets, and once it reaches
+        1 they take over and each migrates at least that many old buckets.
+        Both are stepped up as needed so the load never goes above 1.
+        chain_policy is None, MOVE_TO_FRONT or TRANSPOSE, and reorders a
+        chain whenever put/get/contains_key finds a key in it.
+        If treeify_threshold is above 0, a chain longer than that becomes a
+        SortedBucket (binary searched), and turns back into a LinkedList
+        once removes shrink it to half the threshold.
+        If shrink_load is above 0, a remove that drops the load below it
+        shrinks the table so the load is back at 0.5 (as after growing),
+        but never below the starting capacity. It must be below 0.5, so
+        that a shrink can never be followed straight away by a grow.
+        If bloom_fp_rate is given, a counting Bloom filter of every key's
+        hash is kept alongside the table, so that get, contains_key and
+        remove of a key that is definitely absent return before looking at
+        any bucket. It is sized for a full table to give about that false
+        positive rate, and is rebuilt whenever the table is resized.
+        If max_entries is above 0, the map is a bounded LRU cache: a put of
+        a new key once it holds max_entries evicts the least recently used
+        key (puts and gets count as uses), and the table is sized for
+        max_entries up front so it never grows. Resizing and treeifying
+        rebuild nodes, which would drop them from the recency list, so it
+        cannot be combined with incremental_resize or treeify_threshold.
+        clock is the time source, in seconds, that ttl expiry goes by.
         """
+        if not 0 <= shrink_load < 0.5:
+            raise ValueError("shrink_load must be at least 0 and below 0.5")
+        if max_entries < 0:
+            raise ValueError("max_entries must be at least 0")
+        if max_entries and (incremental_resize or treeify_threshold):
+            raise ValueError("max_entries cannot be combined with "
+                             "incremental_resize or treeify_threshold")
+        if max_entries:
+            capacity = max(capacity, max_entries + 1)
+
         self._buckets = DynamicArray()
 
-        # capacity must be a prime number
-        self._capacity = self._next_prime(capacity)
+        # capacity is a prime number unless using power of two capacities
+        check_policy(capacity_policy)
+        self._capacity_policy = capacity_policy
+        self._power_of_two = capacity_policy == POWER_OF_TWO
+        self._capacity = self._next_capacity(capacity)
         for _ in range(self._capacity):
             self._buckets.append(LinkedList())
 
+        # Low-water mark, and the capacity shrinking stops at
+        self._shrink_load = shrink_load
+        self._min_capacity = self._capacity
+
         self._hash_function = function
         self._size = 0
 
+        # Number of non-empty buckets in self._buckets
+        self._occupied = 0
+
+        if chain_policy not in (None, MOVE_TO_FRONT, TRANSPOSE):
+            raise ValueError("chain_policy must be None, "
+                             f"{MOVE_TO_FRONT!r} or {TRANSPOSE!r}")
+        self._chain_policy = chain_policy
+        self._treeify_threshold = treeify_threshold
+
+        # State of an in-progress incremental resize. While the new buckets
+        # are being allocated, everything still lives in self._buckets. Once
+        # the load reaches 1 they become self._buckets, and the old buckets
+        # before self._migrate_idx have been moved over.
+        self._incremental_resize = incremental_resize
+        self._resizing = False
+        self._resize_buckets = None
+        self._resize_capacity = 0
+        self._old_buckets = None
+        self._old_capacity = 0
+        self._old_occupied = 0
+        self._migrate_idx = 0
+
+        # MapStats while stats are enabled (see map_stats.py)
+        self._stats = None
+
+        # LRU cache state. The recency list is circular through the
+        # sentinel self._lru, from its lru_next (least recently used) round
+        # to its lru_prev (most recently used).
+        self._max_entries = max_entries
+        self._lru = LRUNode(None, None)
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+        # Expiry of keys put with a ttl: a timing wheel of their timers,
+        # and a chaining map from each such key to its timer. Both are only
+        # made by the first put with a ttl.
+        self._clock = clock
+        self._wheel = None
+        self._timers = None
+
+        # Bloom filter of the hashes of every key, if one is kept
+        self._bloom_fp_rate = bloom_fp_rate
+        self._bloom = None
+        self._rebuild_bloom()
+
     def __str__(self) -> str:
         """
         Override string method to provide more readable output
@@ -72,6 +193,54 @@ class HashMap:
 
         return True
 
+    def _next_capacity(self, capacity: int) -> int:
+        """
+        Returns the capacity to use for the requested capacity, according to
+          the capacity policy of the map.
+        """
+        if self._power_of_two:
+            return next_power_of_two(capacity)
+        if self._capacity_policy == PRIME_TABLE:
+            prime = table_prime(capacity)
+            if prime is not None:
+                return prime
+        return self._next_prime(capacity)
+
+    def _hash(self, key: str) -> int:
+        """
+        Returns the full hash of key as stored in its node. Power of two
+          tables only index with the low bits, so the hash is mixed first.
+        """
+        if self._power_of_two:
+            return fmix64(self._hash_function(key))
+        return self._hash_function(key)
+
+    def _hash_keys(self, keys: list) -> list:
+        """
+        Returns the full hash of each key in keys, hashed as one batch.
+        """
+        hashes = hash_batch(keys, self._hash_function)
+        if self._power_of_two:
+            hashes = [fmix64(hash) for hash in hashes]
+        return hashes
+
+    def _bucket_index(self, hash: int) -> int:
+        """
+        Returns the bucket index for a full hash.
+        """
+        if self._power_of_two:
+            return hash & (self._capacity - 1)
+        return hash % self._capacity
+
+    def _old_bucket_index(self, hash: int) -> int:
+        """
+        Returns the bucket index for a full hash in the old buckets of an
+          in-progress incremental resize.
+        """
+        if self._power_of_two:
+            return hash & (self._old_capacity - 1)
+        return hash % self._old_capacity
+
     def get_size(self) -> int:
         """
         Return size of map
@@ -88,41 +257,108 @@ class HashMap:
 
     # ------------------------------------------------------------------ #
 
-    def put(self, key: str, value: object) -> None:
+    def put(self, key: str, value: object, ttl: float = None) -> None:
         """
         Adds a new element to the hash map by hashifying the provided key
           and appending an applicable node to the underlying linked list.
+        If ttl is given, the key expires ttl seconds from now (to within a
+          tick of the timing wheel), after which it is treated as a miss.
+          A put without ttl keeps the key for good again.
         """
-        # If the table load is greater than 1, resize (double capacity)
-        if self.table_load() >= 1:
-            self.resize_table(self._capacity * 2)
+        if ttl is not None and ttl <= 0:
+            raise ValueError("ttl must be above 0")
+
+        hash = self._hash(key)
+        if self._wheel is not None:
+            self._expire()
+
+        if self._bloom is None:
+            self._put_hashed(key, value, hash)
+        else:
+            self._bloom_put(key, value, hash)
 
-        # Update a pre-existing key to the new value
-        idx = self._hash_function(key) % self._capacity
-        inserted = False
-        for node in self._buckets[idx]:
-            if node.key == key:
-                node.value = value
-                inserted = True
+        if ttl is not None or self._wheel is not None:
+            self._set_expiry(key, hash, ttl)
+        if self._max_entries and self._size > self._max_entries:
+            self._evict()
+
+    def _put_hashed(self, key: str, value: object, hash: int) -> None:
+        """
+        Does the work of put given the already computed hash of key, so that
+          batch-hashed keys can be inserted without hashing them again.
+        """
+        if self._resizing:
+            self._resize_step()
+
+        # If the table load is greater than 1, resize (double capacity)
+        if not self._incremental_resize:
+            if self.table_load() >= 1:
+                self.resize_table(self._capacity * 2)
+        else:
+            # Start allocating ahead of time, then switch over at the same
+            # load a one-shot resize would
+            if not self._resizing and self.table_load() >= _PREPARE_LOAD:
+                self._start_resize(self._capacity * 2)
+            if self._resize_buckets is not None and self.table_load() >= 1:
+                self._switch_buckets()
+
+        # A key that has not been migrated yet is updated where it is
+        node = self._find_old(key, hash)
+        if node:
+            node.value = value
+            return
+
+        # Update a pre-existing key to the new value. lookup walks the
+        # chain directly, without allocating an iterator.
+        idx = self._bucket_index(hash)
+        node = self._buckets[idx].lookup(key, hash, self._chain_policy)
+        if node:
+            node.value = value
+            if self._max_entries:
+                self._lru_touch(node)
 
         # Add as a new node if not already in the hashmap
-        if not inserted:
-            self._buckets[idx].insert(key, value)
+        else:
+            self._insert(idx, key, value, hash)
             self._size += 1
 
+    def _insert(self, idx: int, key: str, value: object, hash: int) -> None:
+        """
+        Inserts a new node into bucket idx, switching the bucket over to a
+          SortedBucket once it grows past the treeify threshold.
+        """
+        bucket = self._buckets[idx]
+        if bucket.length() == 0:
+            self._occupied += 1
+        if self._max_entries:
+            node = LRUNode(key, value, None, hash)
+            bucket.push(node)
+            self._lru_append(node)
+        else:
+            bucket.insert(key, value, hash)
+        if (self._treeify_threshold and
+                bucket.length() > self._treeify_threshold and
+                isinstance(bucket, LinkedList)):
+            self._buckets[idx] = SortedBucket(bucket)
+
     def resize_table(self, new_capacity: int) -> None:
         """
         Resizes the Hash map and recalculates the indexes to store the data.
         """
+        # Complete any incremental resize so all data is in self._buckets,
+        # and drop any new buckets allocated ahead of time
+        self._finish_resize()
+        self._resizing = False
+        self._resize_buckets = None
 
         # First check if the new capacity is greater than or equal to 1
         if new_capacity >= 1:
 
-            # Get all the key-value pairs to be re-stored
-            data = self.get_keys_and_values()
+            # Keep the old buckets so their nodes can be re-stored
+            old_buckets = self._buckets
 
             # Update the capacity to the next prime number
-            self._capacity = self._next_prime(new_capacity)
+            self._capacity = self._next_capacity(new_capacity)
 
             # Adjust table load to be less than 1
             # I give up on this one. I cannot figure out the expected resize
@@ -133,20 +369,152 @@ class HashMap:
                 new_capacity = self._capacity * 2
 
                 # Update the capacity to the next prime number
-                self._capacity = self._next_prime(new_capacity)
+                self._capacity = self._next_capacity(new_capacity)
 
             # Re-construct the buckets with the new capacity
             self._buckets = DynamicArray()
             for _ in range(self._capacity):
                 self._buckets.append(LinkedList())
+            self._occupied = 0
+
+            # Re-store all previous data using each node's cached hash,
+            # grouped by new bucket in one vectorized pass if possible. The
+            # nodes themselves are moved, so LRU nodes keep their recency.
+            nodes = [node for bucket_idx in range(old_buckets.length())
+                     for node in old_buckets[bucket_idx]]
+            groups = group_by_bucket([node.hash for node in nodes],
+                                     self._capacity, self._power_of_two)
+            if groups is None:
+                indices = [self._bucket_index(node.hash) for node in nodes]
+                groups = (indices,
+                          sorted(range(len(nodes)), key=indices.__getitem__))
+            self._relink(nodes, *groups)
+
+            self._rebuild_bloom()
+
+    def _relink(self, nodes: list, indices: list, order: list) -> None:
+        """
+        Links the nodes into the (empty) buckets in a single sweep, given
+          the new bucket index of each node and the node positions sorted by
+          bucket. The nodes are reused, and each chain ends up in the same
+          order inserting the nodes one at a time would give.
+        """
+        end = len(order)
+        start = 0
+        while start < end:
+            idx = indices[order[start]]
+
+            # Link this bucket's run of nodes, the last one at the head
+            head = None
+            pos = start
+            while pos < end and indices[order[pos]] == idx:
+                node = nodes[order[pos]]
+                node.next = head
+                head = node
+                pos += 1
+
+            bucket = self._buckets[idx]
+            bucket.adopt(head, pos - start)
+            if (self._treeify_threshold and
+                    bucket.length() > self._treeify_threshold):
+                self._buckets[idx] = SortedBucket(bucket)
+            self._occupied += 1
+            start = pos
+
+    def _start_resize(self, new_capacity: int) -> None:
+        """
+        Begins an incremental resize to the capacity resize_table would pick
+          for new_capacity. The work is done by later calls to _resize_step.
+        """
+        capacity = self._next_capacity(new_capacity)
+        while self._size / capacity >= 1:
+            capacity = self._next_capacity(capacity * 2)
 
-            # Re-calculate and store all previous data
-            for tup_idx in range(data.length()):
-                old_key = data[tup_idx][0]
-                old_val = data[tup_idx][1]
-                idx = self._hash_function(old_key) % self._capacity
-                self._buckets[idx].insert(old_key, old_val)
+        self._resizing = True
+        self._resize_buckets = DynamicArray()
+        self._resize_capacity = capacity
+
+    def _resize_step(self) -> None:
+        """
+        Does one slice of an incremental resize: either allocates more of the
+          new buckets, or migrates some old buckets over. Slices are sized
+          from the puts left before the load reaches the next limit, so the
+          new buckets are ready by a load of 1, and the old ones all moved
+          before the next resize starts.
+        """
+        if self._resize_buckets is not None:
+            # Allocate new buckets; _put_hashed switches over to them
+            buckets = self._resize_buckets
+            remaining = self._resize_capacity - buckets.length()
+            if remaining:
+                puts_left = max(1, self._capacity - self._size)
+                count = max(2 * self._incremental_resize,
+                            -(-remaining // puts_left))
+                for _ in range(min(count, remaining)):
+                    buckets.append(LinkedList())
+            return
+
+        # Migrate old buckets, dropping each one once its nodes are moved
+        remaining = self._old_capacity - self._migrate_idx
+        puts_left = max(1, int(self._capacity * _PREPARE_LOAD) - self._size)
+        count = max(self._incremental_resize, -(-remaining // puts_left))
+        end_idx = self._migrate_idx + min(count, remaining)
+        for bucket_idx in range(self._migrate_idx, end_idx):
+            bucket = self._old_buckets[bucket_idx]
+            if bucket.length() > 0:
+                self._old_occupied -= 1
+            for node in bucket:
+                idx = self._bucket_index(node.hash)
+                self._insert(idx, node.key, node.value, node.hash)
+            self._old_buckets[bucket_idx] = None
+        self._migrate_idx = end_idx
+
+        if self._migrate_idx == self._old_capacity:
+            self._old_buckets = None
+            self._resizing = False
+
+            # The filter stayed correct throughout, as it only goes by
+            # hash, but is now sized for the old capacity
+            self._rebuild_bloom()
+
+    def _switch_buckets(self) -> None:
+        """
+        Makes the new buckets of an incremental resize the current ones,
+          allocating any still missing, and starts migrating the old ones.
+        """
+        buckets = self._resize_buckets
+        while buckets.length() < self._resize_capacity:
+            buckets.append(LinkedList())
+
+        self._old_buckets = self._buckets
+        self._old_capacity = self._capacity
+        self._old_occupied = self._occupied
+        self._migrate_idx = 0
+        self._buckets = buckets
+        self._capacity = self._resize_capacity
+        self._occupied = 0
+        self._resize_buckets = None
+
+    def _finish_resize(self) -> None:
+        """
+        Completes any in-progress migration of old buckets in one go. New
+          buckets allocated ahead of time are left waiting for the switch.
+        """
+        while self._old_buckets is not None:
+            self._resize_step()
+
+    def _find_old(self, key: str, hash: int) -> object:
+        """
+        Returns the node holding key among the old buckets that have not
+          been migrated yet, or None if there is no such node.
+        """
+        if self._old_buckets is None:
+            return None
 
+        idx = self._old_bucket_index(hash)
+        if idx < self._migrate_idx:
+            return None
+        return self._old_buckets[idx].contains(key, hash)
 
     def table_load(self) -> float:
         """
@@ -157,27 +525,52 @@ class HashMap:
 
     def empty_buckets(self) -> int:
         """
-        Returns the number of empty buckets in the hash map.
+        Returns the number of empty buckets in the hash map. While old
+          buckets are still being migrated, each non-empty one counts as one
+          more occupied bucket.
         """
-        empty_buckets = 0
+        return self._capacity - self._occupied_buckets()
 
-        # Check each bucket for a linked list of size 0, increment
-        for idx in range(self._buckets.length()):
-            if self._buckets[idx].length() == 0:
-                empty_buckets += 1
-
-        return empty_buckets
+    def _occupied_buckets(self) -> int:
+        """
+        Returns the number of non-empty buckets, counting those in
+          self._buckets and any old buckets not yet migrated. Both counts
+          are kept up to date by every insert, remove and migration step.
+        """
+        return self._occupied + self._old_occupied
 
     def get(self, key: str) -> object:
         """
         Returns the value assigned to the given key, unless the key does not
           exist within the hash map in which case returns None.
         """
-        idx = self._hash_function(key) % self._capacity
-        for node in self._buckets[idx]:
-            if node.key == key:
-                return node.value
+        hash = self._hash(key)
+        if self._wheel is not None:
+            self._expire()
+        if self._bloom is not None and not self._bloom.might_contain(hash):
+            if self._max_entries:
+                self._count_lookup(None)
+            return None
+        return self._get_hashed(key, hash)
+
+    def _get_hashed(self, key: str, hash: int) -> object:
+        """
+        Does the work of get given the already computed hash of key.
+        """
+        if self._resizing:
+            self._resize_step()
 
+        bucket = self._buckets[self._bucket_index(hash)]
+        node = bucket.lookup(key, hash, self._chain_policy)
+
+        # Fall back to the old buckets during an incremental resize
+        if not node:
+            node = self._find_old(key, hash)
+
+        if self._max_entries:
+            self._count_lookup(node)
+        if node:
+            return node.value
         return None
 
     def contains_key(self, key: str) -> bool:
@@ -186,10 +579,20 @@ class HashMap:
           index it would be at and querying the linked list at that index.
         """
         # First calculate which index would hold that key
-        idx = self._hash_function(key) % self._capacity
+        hash = self._hash(key)
+        if self._wheel is not None:
+            self._expire()
+        if self._bloom is not None and not self._bloom.might_contain(hash):
+            return False
+
+        if self._resizing:
+            self._resize_step()
+        idx = self._bucket_index(hash)
 
         # Return whether the linked list at that index has that key
-        if self._buckets[idx].contains(key):
+        if self._buckets[idx].lookup(key, hash, self._chain_policy):
+            return True
+        if self._find_old(key, hash):
             return True
         return False
 
@@ -198,12 +601,209 @@ class HashMap:
         Removes a key-value pair from the hash map, unless the key is not
           found within the hash map in which case nothing happens.
         """
-        # First calculate which index would hold that key
-        idx = self._hash_function(key) % self._capacity
+        hash = self._hash(key)
+        if self._wheel is not None:
+            self._expire()
+        if self._bloom is not None and not self._bloom.might_contain(hash):
+            return
+
+        if self._resizing:
+            self._resize_step()
+
+        if self._bloom is None and self._wheel is None:
+            self._remove_hashed(key, hash)
+        else:
+            self._remove_key(key, hash)
+        self._maybe_shrink()
+
+    def _remove_hashed(self, key: str, hash: int) -> None:
+        """
+        Does the work of remove given the already computed hash of key.
+        """
+        idx = self._bucket_index(hash)
+        bucket = self._buckets[idx]
+
+        # An LRU node also comes out of the recency list
+        if self._max_entries:
+            node = bucket.contains(key, hash)
+            if node:
+                self._lru_unlink(node)
 
         # Decrement size if a node was removed
-        if self._buckets[idx].remove(key):
+        if bucket.remove(key, hash):
+            self._size -= 1
+            if bucket.length() == 0:
+                self._occupied -= 1
+
+            # Turn a shrunken sorted bucket back into a linked list
+            if (isinstance(bucket, SortedBucket) and
+                    bucket.length() <= self._treeify_threshold // 2):
+                chain = LinkedList()
+                for node in bucket:
+                    chain.insert(node.key, node.value, node.hash)
+                self._buckets[idx] = chain
+        elif self._find_old(key, hash):
+            bucket = self._old_buckets[self._old_bucket_index(hash)]
+            bucket.remove(key, hash)
             self._size -= 1
+            if bucket.length() == 0:
+                self._old_occupied -= 1
+
+    def put_many(self, pairs, ttl: float = None) -> None:
+        """
+        Adds every (key, value) tuple in pairs (a list or DynamicArray) to
+          the hash map. The keys are hashed as one batch, and the table is
+          resized at most once, up front, to fit all of them. ttl applies
+          to every key, as in put.
+        """
+        if ttl is not None and ttl <= 0:
+            raise ValueError("ttl must be above 0")
+
+        if isinstance(pairs, DynamicArray):
+            pairs = [pairs[idx] for idx in range(pairs.length())]
+        hashes = self._hash_keys([pair[0] for pair in pairs])
+        if self._wheel is not None:
+            self._expire()
+
+        # Size the table so the load stays below 1 even if every key is new.
+        # An LRU cache is already sized for as many keys as it can hold.
+        if (not self._max_entries and
+                self._size + len(pairs) >= self._capacity):
+            self.resize_table(self._size + len(pairs) + 1)
+
+        put = self._put_hashed if self._bloom is None else self._bloom_put
+        expiring = ttl is not None or self._wheel is not None
+        for idx in range(len(pairs)):
+            put(pairs[idx][0], pairs[idx][1], hashes[idx])
+            if expiring:
+                self._set_expiry(pairs[idx][0], hashes[idx], ttl)
+            if self._max_entries and self._size > self._max_entries:
+                self._evict()
+
+    def get_many(self, keys) -> DynamicArray:
+        """
+        Returns a DynamicArray with the value of each key in keys (a list or
+          DynamicArray), or None for keys that are not in the hash map.
+        """
+        if isinstance(keys, DynamicArray):
+            keys = [keys[idx] for idx in range(keys.length())]
+        hashes = self._hash_keys(keys)
+        if self._wheel is not None:
+            self._expire()
+
+        bloom = self._bloom
+        values = DynamicArray()
+        for idx in range(len(keys)):
+            if bloom is not None and not bloom.might_contain(hashes[idx]):
+                if self._max_entries:
+                    self._count_lookup(None)
+                values.append(None)
+            else:
+                values.append(self._get_hashed(keys[idx], hashes[idx]))
+        return values
+
+    def remove_many(self, keys) -> None:
+        """
+        Removes each key in keys (a list or DynamicArray) from the hash map.
+        """
+        if isinstance(keys, DynamicArray):
+            keys = [keys[idx] for idx in range(keys.length())]
+        hashes = self._hash_keys(keys)
+
+        if self._wheel is not None:
+            self._expire()
+
+        remove = (self._remove_hashed
+                  if self._bloom is None and self._wheel is None
+                  else self._remove_key)
+        for idx in range(len(keys)):
+            if self._resizing:
+                self._resize_step()
+            remove(keys[idx], hashes[idx])
+
+        # Shrink once at the end, rather than once per halving
+        self._maybe_shrink()
+
+    def _lru_append(self, node: LRUNode) -> None:
+        """
+        Links node into the recency list as the most recently used.
+        """
+        sentinel = self._lru
+        node.lru_prev = sentinel.lru_prev
+        node.lru_next = sentinel
+        sentinel.lru_prev.lru_next = node
+        sentinel.lru_prev = node
+
+    def _lru_unlink(self, node: LRUNode) -> None:
+        """
+        Takes node out of the recency list.
+        """
+        node.lru_prev.lru_next = node.lru_next
+        node.lru_next.lru_prev = node.lru_prev
+
+    def _lru_touch(self, node: LRUNode) -> None:
+        """
+        Moves node to the most recently used end of the recency list.
+        """
+        if node is not self._lru.lru_prev:
+            self._lru_unlink(node)
+            self._lru_append(node)
+
+    def _count_lookup(self, node: LRUNode) -> None:
+        """
+        Counts a get of an LRU cache as a hit (which is a use of node) or,
+          if node is None, a miss.
+        """
+        if node:
+            self._hits += 1
+            self._lru_touch(node)
+        else:
+            self._misses += 1
+
+    def _evict(self) -> None:
+        """
+        Removes the least recently used key of an LRU cache.
+        """
+        node = self._lru.lru_next
+        self._remove_key(node.key, node.hash)
+        self._evictions += 1
+
+    def get_cache_stats(self) -> dict:
+        """
+        Returns the hits, misses and evictions of an LRU cache so far, with
+          its size and max_entries.
+        """
+        return {
+            'hits': self._hits,
+            'misses': self._misses,
+            'evictions': self._evictions,
+            'size': self._size,
+            'max_entries': self._max_entries,
+        }
+
+    def _rebuild_bloom(self) -> None:
+        """
+        Replaces the Bloom filter, if one is kept, with one sized for the
+          current capacity and holding the hash of every key.
+        """
+        if self._bloom_fp_rate is None:
+            return
+        bloom = CountingBloomFilter(max(self._size, self._capacity),
+                                    self._bloom_fp_rate)
+        for node in self._entries():
+            bloom.add(node.hash)
+        self._bloom = bloom
+
+    def _maybe_shrink(self) -> None:
+        """
+        Shrinks the table if the load has dropped below the low-water mark,
+          to the capacity that brings the load back up to 0.5.
+        """
+        if self._size < self._shrink_load * self._capacity:
+            capacity = max(self._next_capacity(2 * self._size + 1),
+                           self._min_capacity)
+            if capacity < self._capacity:
+                self.resize_table(capacity)
 
     def get_keys_and_values(self) -> DynamicArray:
         """
@@ -212,19 +812,31 @@ class HashMap:
         """
         keys_and_values = DynamicArray()
 
-        # Iterate over each bucket with a LinkedList of length > 0
-        for bucket_idx in range(self._capacity):
-            if self._buckets[bucket_idx].length() > 0:
-                # Append each key-value pair in tuple form
-                for node in self._buckets[bucket_idx]:
-                    keys_and_values.append((node.key, node.value))
+        # Append each key-value pair in tuple form
+        for pair in self.items():
+            keys_and_values.append(pair)
 
         return keys_and_values
 
+    def _entries(self):
+        """
+        Generator over the node of every key-value pair, one bucket at a
+          time. Any migration of old buckets is finished first, so lookups made
+          during the traversal do not move nodes between buckets.
+        """
+        self._finish_resize()
+        buckets = self._buckets
+        for bucket_idx in range(buckets.length()):
+            yield from buckets[bucket_idx]
+
     def clear(self) -> None:
         """
-        Clears the contents of the hash map (without changing capacity.)
+        Clears the contents of the hash map (without changing capacity,
+          unless shrinking is on, which goes back to the starting capacity.)
         """
+        if self._shrink_load:
+            self._capacity = self._min_capacity
+
         # Assign buckets to an empty DynamicArray
         self._buckets = DynamicArray()
 
@@ -232,8 +844,54 @@ class HashMap:
         for _ in range(self._capacity):
             self._buckets.append(LinkedList())
 
-        # Reset size
+        # Reset size and drop any in-progress incremental resize
         self._size = 0
+        self._occupied = 0
+        self._lru = LRUNode(None, None)
+        self._resizing = False
+        self._resize_buckets = None
+        self._old_buckets = None
+        self._old_occupied = 0
+        self._wheel = None
+        self._timers = None
+        self._rebuild_bloom()
+
+    def _probe_length(self, key: str, hash: int) -> tuple[int, bool]:
+        """
+        Returns how many nodes a lookup of key looks at, and whether it
+          finds key. Only used for statistics.
+        """
+        length = 0
+        buckets = [self._buckets[self._bucket_index(hash)]]
+        if (self._old_buckets is not None and
+                self._old_bucket_index(hash) >= self._migrate_idx):
+            buckets.append(self._old_buckets[self._old_bucket_index(hash)])
+
+        for bucket in buckets:
+            if isinstance(bucket, SortedBucket):
+                # A binary search looks at about log2(length) nodes
+                length += bucket.length().bit_length()
+                if bucket.contains(key, hash):
+                    return length, True
+                continue
+            for node in bucket:
+                length += 1
+                if node.hash == hash and node.key == key:
+                    return length, True
+        return length, False
+
+    def _chain_lengths(self) -> list:
+        """
+        Returns the length of every bucket, including any old buckets not
+          yet migrated by an incremental resize. Only used for statistics.
+        """
+        lengths = [self._buckets[idx].length()
+                   for idx in range(self._buckets.length())]
+        if self._old_buckets is not None:
+            lengths += [self._old_buckets[idx].length()
+                        for idx in range(self._migrate_idx,
+                                         self._old_capacity)]
+        return lengths
 
 
 def find_mode(da: DynamicArray) -> tuple[DynamicArray, int]:
@@ -245,30 +903,110 @@ def find_mode(da: DynamicArray) -> tuple[DynamicArray, int]:
     # use this instance of your Separate Chaining HashMap
     map = HashMap()
 
-    # O(N) to insert each element in da
-    for idx in range(da.length()):
+    # O(N) to count each element in da
+    _add_counts(map, [da[idx] for idx in range(da.length())])
+
+    # + O(n) = 2O(n) =~ O(n) to pick out the modes
+    return _modes(map)
+
+
+def find_mode_parallel(da: DynamicArray, workers: int = None,
+                       min_keys: int = PARALLEL_MIN_KEYS
+                       ) -> tuple[DynamicArray, int]:
+    """
+    Same as find_mode, but splits da into one disjoint range per worker
+      process and counts the ranges in parallel. The partial counts (one
+      per distinct key) are then merged into one map before the modes are
+      picked out. workers defaults to the number of CPUs. With one worker,
+      or fewer than min_keys keys, this is just find_mode.
+    Where processes can be forked, the workers inherit da and are only
+      sent the bounds of their range; otherwise each is sent its keys.
+    """
+    global _fork_input
+
+    length = da.length()
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or length < max(min_keys, 1):
+        return find_mode(da)
+
+    range_size = -(-length // workers)
+    bounds = [(start, min(start + range_size, length))
+              for start in range(0, length, range_size)]
+    if 'fork' in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context('fork')
+        count, tasks = _count_range, bounds
+        _fork_input = da
+    else:
+        context = None
+        count = _count_chunk
+        tasks = [[da[idx] for idx in range(start, end)]
+                 for start, end in bounds]
+
+    # Merge each worker's keys and counts as they come back
+    map = HashMap()
+    try:
+        with ProcessPoolExecutor(max_workers=len(tasks),
+                                 mp_context=context) as executor:
+            for keys, counts in executor.map(count, tasks):
+                _add_counts(map, keys, counts)
+    finally:
+        _fork_input = None
+
+    return _modes(map)
+
+
+def _count_range(bounds: tuple) -> tuple[list, list]:
+    """
+    Counts the keys of the inherited DynamicArray from index bounds[0] up
+      to bounds[1] in a forked worker process.
+    """
+    start, end = bounds
+    return _count_chunk([_fork_input[idx] for idx in range(start, end)])
+
+
+def _count_chunk(keys: list) -> tuple[list, list]:
+    """
+    Counts the keys of one chunk in a worker process and returns a list of
+      the distinct keys and a list of their counts.
+    """
+    map = HashMap()
+    _add_counts(map, keys)
+    pairs = list(map.items())
+    return [pair[0] for pair in pairs], [pair[1] for pair in pairs]
+
+
+def _add_counts(map: HashMap, keys: list, amounts: list = None) -> None:
+    """
+    Adds amounts[idx] (or 1 if amounts is None) to the count held in map
+      for each keys[idx]. The keys are hashed in one batch up front.
+    """
+    hashes = map._hash_keys(keys)
+    for idx in range(len(keys)):
+        amount = amounts[idx] if amounts else 1
+
         # First get the current count of the element or None
-        count = map.get(da[idx])
-        # If a current count exists, increment. Otherwise, set to 1.
+        count = map._get_hashed(keys[idx], hashes[idx])
+        # If a current count exists, increment. Otherwise, set to amount.
         if count:
-            map.put(da[idx], count + 1)
+            map._put_hashed(keys[idx], count + amount, hashes[idx])
         else:
-            map.put(da[idx], 1)
+            map._put_hashed(keys[idx], amount, hashes[idx])
 
-    # Get all the word and count pairs (+ O(n) = 2O(n) =~ O(n)
-    counts = map.get_keys_and_values()
 
-    # Find the max frequency (+ O(n) = 3O(n) =~ O(n)
+def _modes(map: HashMap) -> tuple[DynamicArray, int]:
+    """
+    Returns a DynamicArray of the keys with the highest count in map, along
+      with that count, in a single pass over the counts.
+    """
+    # Track the max frequency, restarting the modes whenever it goes up
     freq = -1
-    for idx in range(counts.length()):
-        if counts[idx][1] >= freq:
-            freq = counts[idx][1]
-
-    # Build the DynamicArray of modes (+ O(n) = 4O(n) =~ O(n)
     modes = DynamicArray()
-    for idx in range(counts.length()):
-        if counts[idx][1] == freq:
-            modes.append(counts[idx][0])
+    for key, count in map.items():
+        if count > freq:
+            freq = count
+            modes = DynamicArray()
+        if count == freq:
+            modes.append(key)
 
     return (modes, freq)
 
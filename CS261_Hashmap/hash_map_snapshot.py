@@ -0,0 +1,291 @@
+# Name: Tom Haney
+# Course: CS261 - Data Structures
+# Description: Binary snapshots of the open addressing Hash Map, and a read
+#  only map that answers get and contains_key straight out of a memory mapped
+#  snapshot file, so a large map can be loaded without re-putting every key.
+#  Pages of the file are only read in as lookups touch them.
+#
+#  File layout (all integers little-endian):
+#    header   magic, version, flags, capacity, size, heap offset (40 bytes)
+#    slots    capacity x (hash, record offset) pairs of uint64, where an
+#             offset of 0 marks an empty slot
+#    heap     one record per entry: key length (uint32), value length
+#             (uint32), value type (uint8), UTF-8 key, encoded value
+#
+#  Slots are filled with the same quadratic (or triangular, for power of two
+#  capacities) probing as hash_map_oa.HashMap, indexed by the low 63 bits of
+#  the map's hash, so a snapshot can be written from any of the open
+#  addressing maps using their cached hashes. Tombstones are not written.
+#
+#  Values that are not None, int, float, str or bytes are pickled, so only
+#  open snapshots from trusted sources.
+
+import mmap
+import pickle
+import struct
+import sys
+from array import array
+
+import hash_map_oa
+from a6_include import DynamicArray
+
+
+MAGIC = b'CS261OA\x00'
+VERSION = 1
+
+# Header flags
+FLAG_POWER_OF_TWO = 1
+
+_HEADER = struct.Struct('<8sHHIQQQ')
+_SLOT = struct.Struct('<QQ')
+_RECORD = struct.Struct('<IIB')
+
+# Value types
+_NONE, _INT, _FLOAT, _STR, _BYTES, _PICKLE = range(6)
+
+# Hashes are indexed and stored by their low 63 bits, which is all the
+# struct of arrays map keeps
+_HASH_MASK = (1 << 63) - 1
+
+
+def _encode_value(value: object) -> tuple[int, bytes]:
+    """
+    Returns the type and bytes a value is stored as.
+    """
+    if value is None:
+        return _NONE, b''
+    if type(value) is int:
+        return _INT, str(value).encode('ascii')
+    if type(value) is float:
+        return _FLOAT, repr(value).encode('ascii')
+    if type(value) is str:
+        return _STR, value.encode('utf-8', 'surrogatepass')
+    if type(value) is bytes:
+        return _BYTES, value
+    return _PICKLE, pickle.dumps(value)
+
+
+def _decode_value(value_type: int, data: bytes) -> object:
+    """
+    Returns the value stored as data with the given type.
+    """
+    if value_type == _NONE:
+        return None
+    if value_type == _INT:
+        return int(data)
+    if value_type == _FLOAT:
+        return float(data)
+    if value_type == _STR:
+        return data.decode('utf-8', 'surrogatepass')
+    if value_type == _BYTES:
+        return data
+    return pickle.loads(data)
+
+
+class _Probing:
+    """
+    The hashing and probe sequence of hash_map_oa.HashMap, for a table of
+    the given capacity that is not held in a DynamicArray
+    """
+
+    # Borrowed so the probe sequence cannot drift from the real map's
+    _hash = hash_map_oa.HashMap._hash
+    _probe = hash_map_oa.HashMap._probe
+
+    def __init__(self, capacity: int, power_of_two: bool, function) -> None:
+        self._capacity = capacity
+        self._power_of_two = power_of_two
+        self._hash_function = function
+
+    def _bucket_index(self, hash: int) -> int:
+        """
+        Returns the initial slot index for a 63-bit hash.
+        """
+        if self._power_of_two:
+            return hash & (self._capacity - 1)
+        return hash % self._capacity
+
+
+def save(map: hash_map_oa.HashMap, path: str) -> None:
+    """
+    Writes the entries of an open addressing map to a snapshot file at path.
+      Keys must be strings. Entries are re-placed using their cached
+      hashes, into a table kept below half full.
+    """
+    capacity = map.get_capacity()
+    while map.get_size() / capacity >= 0.5:
+        capacity = map._next_capacity(capacity * 2)
+    layout = _Probing(capacity, map._power_of_two, None)
+
+    # slots holds (hash, offset) pairs side by side
+    slots = array('Q', bytes(_SLOT.size * capacity))
+    heap_offset = _HEADER.size + _SLOT.size * capacity
+    offset = heap_offset
+
+    with open(path, 'wb') as file:
+        # Write the heap first, placing each entry as its offset is known
+        file.seek(heap_offset)
+        for entry in map:
+            key = entry.key.encode('utf-8', 'surrogatepass')
+            value_type, value = _encode_value(entry.value)
+            file.write(_RECORD.pack(len(key), len(value), value_type))
+            file.write(key)
+            file.write(value)
+
+            hash = entry.hash & _HASH_MASK
+            idx = layout._bucket_index(hash)
+            start_idx = idx
+            quad = 1
+            while slots[2 * idx + 1]:
+                idx = layout._probe(start_idx, quad)
+                quad += 1
+            slots[2 * idx] = hash
+            slots[2 * idx + 1] = offset
+
+            offset += _RECORD.size + len(key) + len(value)
+
+        if sys.byteorder == 'big':
+            slots.byteswap()
+
+        flags = FLAG_POWER_OF_TWO if map._power_of_two else 0
+        file.seek(0)
+        file.write(_HEADER.pack(MAGIC, VERSION, flags, 0, capacity,
+                                map.get_size(), heap_offset))
+        file.write(slots.tobytes())
+
+
+def open_mmap(path: str, function) -> "SnapshotMap":
+    """
+    Opens the snapshot at path as a read only map. function must be the
+      hash function of the map the snapshot was saved from.
+    """
+    return SnapshotMap(path, function)
+
+
+class SnapshotMap(_Probing):
+    """
+    Read only map served directly from a memory mapped snapshot file
+    """
+
+    def __init__(self, path: str, function) -> None:
+        """
+        Maps the snapshot file at path into memory and checks its header.
+        """
+        with open(path, 'rb') as file:
+            self._buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        try:
+            (magic, version, flags, _, capacity, size,
+             heap_offset) = _HEADER.unpack_from(self._buffer)
+        except struct.error:
+            self._buffer.close()
+            raise ValueError(f"{path} is not a hash map snapshot")
+        if magic != MAGIC or version != VERSION:
+            self._buffer.close()
+            raise ValueError(f"{path} is not a version {VERSION} hash map "
+                             "snapshot")
+
+        super().__init__(capacity, bool(flags & FLAG_POWER_OF_TWO), function)
+        self._size = size
+        self._heap_offset = heap_offset
+
+    def __enter__(self) -> "SnapshotMap":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """
+        Unmaps the snapshot file.
+        """
+        self._buffer.close()
+
+    def get_size(self) -> int:
+        """
+        Return size of map
+        """
+        return self._size
+
+    def get_capacity(self) -> int:
+        """
+        Return capacity of map
+        """
+        return self._capacity
+
+    def table_load(self) -> float:
+        """
+        Returns the load factor of the snapshot's table.
+        """
+        return self._size / self._capacity
+
+    def _find(self, key: str) -> int:
+        """
+        Returns the offset of the record holding key, or 0 if the key is not
+          in the snapshot.
+        """
+        buffer = self._buffer
+        hash = self._hash(key) & _HASH_MASK
+        encoded = key.encode('utf-8', 'surrogatepass')
+
+        idx = self._bucket_index(hash)
+        start_idx = idx
+        quad = 1
+        while True:
+            slot_hash, offset = _SLOT.unpack_from(
+                buffer, _HEADER.size + _SLOT.size * idx)
+            if not offset:
+                return 0
+            if slot_hash == hash:
+                key_start = offset + _RECORD.size
+                key_length = _RECORD.unpack_from(buffer, offset)[0]
+                if (key_length == len(encoded) and
+                        buffer[key_start:key_start + key_length] == encoded):
+                    return offset
+            idx = self._probe(start_idx, quad)
+            quad += 1
+
+    def _record(self, offset: int) -> tuple[str, object]:
+        """
+        Returns the key and value of the record at offset.
+        """
+        key_length, value_length, value_type = _RECORD.unpack_from(
+            self._buffer, offset)
+        key_start = offset + _RECORD.size
+        value_start = key_start + key_length
+        key = self._buffer[key_start:value_start].decode('utf-8',
+                                                         'surrogatepass')
+        value = _decode_value(value_type,
+                              self._buffer[value_start:
+                                           value_start + value_length])
+        return key, value
+
+    def get(self, key: str) -> object:
+        """
+        Returns the value associated with key, or None if the key is not in
+          the snapshot.
+        """
+        offset = self._find(key)
+        if offset:
+            return self._record(offset)[1]
+        return None
+
+    def contains_key(self, key: str) -> bool:
+        """
+        Returns whether key is in the snapshot.
+        """
+        return self._find(key) != 0
+
+    def get_keys_and_values(self) -> DynamicArray:
+        """
+        Returns a DynamicArray containing tuples with each key-value pair,
+          in heap order.
+        """
+        keys_and_values = DynamicArray()
+        offset = self._heap_offset
+        for _ in range(self._size):
+            key_length, value_length, _ = _RECORD.unpack_from(self._buffer,
+                                                              offset)
+            keys_and_values.append(self._record(offset))
+            offset += _RECORD.size + key_length + value_length
+        return keys_and_values
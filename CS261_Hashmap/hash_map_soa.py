@@ -0,0 +1,233 @@
+# Name: Tom Haney
+# Course: CS261 - Data Structures
+# Description: Implementation for an open addressing Hash Map that stores its
+#  table as parallel flat arrays instead of one HashEntry object per slot: a
+#  bytearray of slot states (empty, full or deleted), an array('q') of cached
+#  hashes, and plain lists of keys and values. Probing and resizing behave
+#  exactly like hash_map_oa, but lookups only touch contiguous memory and
+#  never allocate, and there is no per-entry object overhead.
+
+from array import array
+
+import hash_map_oa
+from a6_include import HashEntry, hash_function_1, hash_function_2
+
+
+# Slot states
+EMPTY = 0
+FULL = 1
+DELETED = 2
+
+# Cached hashes are kept to 63 bits so they fit in a signed array('q')
+_HASH_MASK = (1 << 63) - 1
+
+
+class HashMap(hash_map_oa.HashMap):
+
+    def __str__(self) -> str:
+        """
+        Override string method to provide more readable output, matching
+          the output of the HashEntry based map.
+        """
+        out = ''
+        for i in range(self._capacity):
+            if self._states[i] == EMPTY:
+                slot = 'None'
+            else:
+                slot = (f"K: {self._keys[i]} V: {self._values[i]} "
+                        f"TS: {self._states[i] == DELETED}")
+            out += str(i) + ': ' + slot + '\n'
+        return out
+
+    def _reset_buckets(self) -> None:
+        """
+        Replaces the table with self._capacity empty slots.
+        """
+        self._states = bytearray(self._capacity)
+        self._hashes = array('q', bytes(8 * self._capacity))
+        self._keys = [None] * self._capacity
+        self._values = [None] * self._capacity
+
+    def _hash(self, key: str) -> int:
+        """
+        Returns the full hash of key, cut down to 63 bits.
+        """
+        return super()._hash(key) & _HASH_MASK
+
+    def _hash_keys(self, keys: list) -> list:
+        """
+        Returns the full hash of each key in keys, cut down to 63 bits.
+        """
+        return [hash & _HASH_MASK for hash in super()._hash_keys(keys)]
+
+    # ------------------------------------------------------------------ #
+
+    def _put_hashed(self, key: str, value: object, hash: int) -> None:
+        """
+        Inserts a new key-value pair into the hash map, or overwrites the
+          value of an existing key. The first deleted slot passed is reused
+          once the key is known to be absent.
+        """
+        self._make_room()
+
+        states, hashes, keys = self._states, self._hashes, self._keys
+        idx = self._bucket_index(hash)
+        start_idx = idx
+
+        reuse_idx = -1
+        quad = 1
+        while states[idx] != EMPTY:
+            if states[idx] == DELETED:
+                if reuse_idx < 0:
+                    reuse_idx = idx
+            elif hashes[idx] == hash and keys[idx] == key:
+                self._values[idx] = value
+                return
+            idx = self._probe(start_idx, quad)
+            quad += 1
+
+        if reuse_idx >= 0:
+            idx = reuse_idx
+            self._tombstones -= 1
+        states[idx] = FULL
+        hashes[idx] = hash
+        keys[idx] = key
+        self._values[idx] = value
+        self._size += 1
+
+    def resize_table(self, new_capacity: int) -> None:
+        """
+        Resizes the table to the next capacity from new_capacity that keeps
+          the load below 0.5, then re-places every live slot using its
+          cached hash.
+        """
+        if new_capacity >= self._size:
+
+            old_states, old_hashes = self._states, self._hashes
+            old_keys, old_values = self._keys, self._values
+
+            self._capacity = self._next_capacity(new_capacity)
+            while self.table_load() >= 0.5:
+                self._capacity = self._next_capacity(self._capacity * 2)
+
+            self._reset_buckets()
+            states, hashes = self._states, self._hashes
+
+            # Place the full slots in order of initial index
+            full = [old_idx for old_idx in range(len(old_states))
+                    if old_states[old_idx] == FULL]
+            starts, order = self._placement_order(
+                [old_hashes[old_idx] for old_idx in full])
+            for pos in order:
+                old_idx = full[pos]
+                hash = old_hashes[old_idx]
+                idx = starts[pos]
+                start_idx = idx
+                quad = 1
+                while states[idx] != EMPTY:
+                    idx = self._probe(start_idx, quad)
+                    quad += 1
+
+                states[idx] = FULL
+                hashes[idx] = hash
+                self._keys[idx] = old_keys[old_idx]
+                self._values[idx] = old_values[old_idx]
+
+            # Deleted slots are not carried over
+            self._tombstones = 0
+            self._rebuild_bloom()
+
+    def _get_hashed(self, key: str, hash: int) -> object:
+        """
+        Returns the value associated with key, or None if it is not found.
+        """
+        idx = self._find(key, hash)
+        if idx >= 0:
+            return self._values[idx]
+        return None
+
+    def _find(self, key: str, hash: int) -> int:
+        """
+        Returns the index of the full slot holding key, or -1 if the key is
+          not in the hash map.
+        """
+        states, hashes, keys = self._states, self._hashes, self._keys
+        idx = self._bucket_index(hash)
+        start_idx = idx
+
+        quad = 1
+        while states[idx] != EMPTY:
+            if (states[idx] == FULL and hashes[idx] == hash and
+                    keys[idx] == key):
+                return idx
+            idx = self._probe(start_idx, quad)
+            quad += 1
+
+        return -1
+
+    def _probe_length(self, key: str, hash: int) -> tuple[int, bool]:
+        """
+        Returns how many full or deleted slots a lookup of key looks at, and
+          whether it finds key. Only used for statistics.
+        """
+        states, hashes, keys = self._states, self._hashes, self._keys
+        idx = self._bucket_index(hash)
+        start_idx = idx
+
+        length = 0
+        quad = 1
+        while states[idx] != EMPTY:
+            length += 1
+            if (states[idx] == FULL and hashes[idx] == hash and
+                    keys[idx] == key):
+                return length, True
+            idx = self._probe(start_idx, quad)
+            quad += 1
+        return length, False
+
+    def _remove_hashed(self, key: str, hash: int) -> None:
+        """
+        Removes the matching key-value pair by marking its slot deleted.
+        """
+        idx = self._find(key, hash)
+        if idx >= 0:
+            self._states[idx] = DELETED
+            self._keys[idx] = None
+            self._values[idx] = None
+            self._size -= 1
+            self._tombstones += 1
+
+    def _entries(self):
+        """
+        Generator over the full slots, each returned as a HashEntry.
+        """
+        states, hashes = self._states, self._hashes
+        keys, values = self._keys, self._values
+        for idx in range(len(states)):
+            if states[idx] == FULL:
+                yield HashEntry(keys[idx], values[idx], hashes[idx])
+
+
+# ------------------- BASIC TESTING ---------------------------------------- #
+
+
+if __name__ == "__main__":
+
+    print("\nStruct of arrays - put example")
+    print("------------------------------")
+    m = HashMap(53, hash_function_1)
+    for i in range(150):
+        m.put('str' + str(i), i * 100)
+        if i % 25 == 24:
+            print(m.empty_buckets(), round(m.table_load(), 2), m.get_size(), m.get_capacity())
+
+    print("\nStruct of arrays - iteration example")
+    print("------------------------------------")
+    m = HashMap(10, hash_function_2)
+    for i in range(5):
+        m.put(str(i), str(i * 24))
+    m.remove('0')
+    m.remove('4')
+    print(m)
+    for item in m:
+        print('K:', item.key, 'V:', item.value)
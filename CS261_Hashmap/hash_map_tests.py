@@ -0,0 +1,945 @@
+# Name: Tom Haney
+# Course: CS261 - Data Structures
+# Description: Unit tests for the chaining (SC) and open addressing (OA) hash
+#  map implementations, beyond the PDF examples in each file's main block.
+
+import contextlib
+import io
+import itertools
+import os
+import random
+import tempfile
+import time
+import unittest
+
+import capacity_policy
+import bench_concurrent
+import bench_suite
+import hash_batch
+import hash_map_concurrent
+import hash_map_int
+import hash_map_oa
+import hash_map_rh
+import hash_map_sc
+import hash_map_snapshot
+import hash_map_soa
+import hash_seeded
+import timing_wheel
+from sorted_bucket import SortedBucket
+from a6_include import (MOVE_TO_FRONT, TRANSPOSE, DynamicArray, HashEntry,
+                        LinkedList, SLNode, hash_function_1, hash_function_2)
+
+
+class CountingHash:
+    """
+    Wraps a hash function and counts how many times it has been called.
+    """
+
+    def __init__(self, function) -> None:
+        self.function = function
+        self.calls = 0
+
+    def __call__(self, key: str) -> int:
+        self.calls += 1
+        return self.function(key)
+
+
+class UnitTests(unittest.TestCase):
+
+    def test_sc_resize_uses_cached_hash(self):
+        # Tests that resizing the SC map never calls the hash function again
+        counter = CountingHash(hash_function_1)
+        m = hash_map_sc.HashMap(11, counter)
+        for i in range(100):
+            m.put('str' + str(i), i)
+        calls = counter.calls
+        m.resize_table(500)
+        self.assertEqual(counter.calls, calls)
+        for i in range(100):
+            self.assertEqual(m.get('str' + str(i)), i)
+
+    def test_oa_resize_uses_cached_hash(self):
+        # Tests that resizing the OA map never calls the hash function again
+        counter = CountingHash(hash_function_2)
+        m = hash_map_oa.HashMap(11, counter)
+        for i in range(100):
+            m.put('str' + str(i), i)
+        calls = counter.calls
+        m.resize_table(500)
+        self.assertEqual(counter.calls, calls)
+        for i in range(100):
+            self.assertEqual(m.get('str' + str(i)), i)
+
+    def test_colliding_keys_stay_distinct(self):
+        # Tests that anagram keys (same hash_function_1 hash) do not clobber
+        # each other in either map
+        for module in (hash_map_sc, hash_map_oa):
+            m = module.HashMap(11, hash_function_1)
+            m.put('str12', 1)
+            m.put('str21', 2)
+            self.assertEqual(m.get('str12'), 1)
+            self.assertEqual(m.get('str21'), 2)
+            self.assertEqual(m.get_size(), 2)
+
+    def test_oa_get_probes_past_tombstones(self):
+        # Tests that a removed colliding key does not hide the keys after it
+        m = hash_map_oa.HashMap(11, hash_function_1)
+        m.put('str12', 1)
+        m.put('str21', 2)
+        m.remove('str12')
+        self.assertEqual(m.get_tombstones(), 1)
+        self.assertIsNone(m.get('str12'))
+        self.assertEqual(m.get('str21'), 2)
+        self.assertTrue(m.contains_key('str21'))
+        self.assertEqual(m.empty_buckets(), m.get_capacity() - 2)
+
+        # Re-putting an existing key past a tombstone must not duplicate it
+        m.put('str21', 3)
+        self.assertEqual(m.get_size(), 1)
+        m.remove('str21')
+        self.assertIsNone(m.get('str21'))
+        self.assertEqual(m.get_size(), 0)
+
+    def test_oa_probing_always_reaches_empty_slot(self):
+        # Tests a seed whose keys fill the whole probe set of one slot of a
+        # prime table, which used to leave a lookup probing forever
+        for module in (hash_map_oa, hash_map_soa):
+            m = module.HashMap(
+                11, hash_seeded.make_murmur3(18395999968397771499))
+            self.check_against_dict(m, 600)
+            self.assertLess((m.get_size() + m.get_tombstones()) * 2,
+                            m.get_capacity())
+
+    def test_oa_churn_compacts_in_place(self):
+        # Tests that constant delete/reinsert churn compacts tombstones
+        # instead of growing the table forever
+        m = hash_map_oa.HashMap(53, hash_function_2)
+        for i in range(20):
+            m.put('key' + str(i), i)
+        capacity = m.get_capacity()
+        for i in range(20, 2000):
+            m.remove('key' + str(i - 20))
+            m.put('key' + str(i), i)
+            self.assertLessEqual(m.get_size() + m.get_tombstones(),
+                                 m.get_capacity() // 2 + 1)
+        self.assertEqual(m.get_capacity(), capacity)
+        self.assertEqual(m.get_size(), 20)
+        for i in range(1980, 2000):
+            self.assertEqual(m.get('key' + str(i)), i)
+
+    def test_linked_list_lookup_reorders(self):
+        # Tests the move to front and transpose chain policies
+        chain = LinkedList()
+        for key in ('d', 'c', 'b', 'a'):
+            chain.insert(key, key)
+        self.assertEqual(str(chain), 'SLL [(a: a) -> (b: b) -> (c: c) -> '
+                                     '(d: d)]')
+        self.assertEqual(chain.lookup('c', reorder=TRANSPOSE).value, 'c')
+        self.assertEqual(str(chain), 'SLL [(a: a) -> (c: c) -> (b: b) -> '
+                                     '(d: d)]')
+        chain.lookup('d', reorder=MOVE_TO_FRONT)
+        self.assertEqual(str(chain), 'SLL [(d: d) -> (a: a) -> (c: c) -> '
+                                     '(b: b)]')
+        chain.lookup('a', reorder=TRANSPOSE)
+        self.assertEqual(str(chain), 'SLL [(a: a) -> (d: d) -> (c: c) -> '
+                                     '(b: b)]')
+        self.assertIsNone(chain.lookup('e', reorder=MOVE_TO_FRONT))
+        self.assertEqual(chain.length(), 4)
+
+    def test_sc_chain_policies(self):
+        # Tests that self-organizing chains keep the map consistent, and
+        # that a hit moves the key to the front of its chain
+        for policy in (MOVE_TO_FRONT, TRANSPOSE):
+            self.check_against_dict(
+                hash_map_sc.HashMap(11, hash_function_1, chain_policy=policy))
+
+        m = hash_map_sc.HashMap(11, hash_function_1,
+                                chain_policy=MOVE_TO_FRONT)
+        for key in ('str123', 'str132', 'str213', 'str231'):
+            m.put(key, key)
+        self.assertEqual(m.get('str123'), 'str123')
+        bucket = m._buckets[m._bucket_index(hash_function_1('str123'))]
+        self.assertEqual(next(iter(bucket)).key, 'str123')
+
+    def test_sc_treeified_buckets(self):
+        # Tests that a chain of anagram keys (all with the same
+        # hash_function_1 hash) becomes a sorted bucket and back again
+        keys = [''.join(p) for p in itertools.permutations('1234')]
+        m = hash_map_sc.HashMap(53, hash_function_1, treeify_threshold=8)
+        for key in keys:
+            m.put(key, key)
+        idx = m._bucket_index(hash_function_1(keys[0]))
+        self.assertIsInstance(m._buckets[idx], SortedBucket)
+        for key in keys:
+            self.assertEqual(m.get(key), key)
+            self.assertTrue(m.contains_key(key))
+
+        for key in keys[4:]:
+            m.remove(key)
+        self.assertIsInstance(m._buckets[idx], LinkedList)
+        self.assertEqual(m.get_size(), 4)
+        for key in keys[:4]:
+            self.assertEqual(m.get(key), key)
+
+        self.check_against_dict(
+            hash_map_sc.HashMap(11, hash_function_1, treeify_threshold=2))
+
+    def test_find_mode_parallel(self):
+        # Tests that the process pool find_mode agrees with the serial one,
+        # both when it really uses the pool and when the input is too small
+        rng = random.Random(10)
+        da = DynamicArray([str(rng.randrange(50)) for _ in range(5000)])
+        modes, frequency = hash_map_sc.find_mode(da)
+        for min_keys in (0, hash_map_sc.PARALLEL_MIN_KEYS):
+            parallel_modes, parallel_frequency = \
+                hash_map_sc.find_mode_parallel(da, 3, min_keys)
+            self.assertEqual(parallel_frequency, frequency)
+            self.assertEqual(
+                sorted(parallel_modes[i]
+                       for i in range(parallel_modes.length())),
+                sorted(modes[i] for i in range(modes.length())))
+
+        modes, frequency = hash_map_sc.find_mode_parallel(DynamicArray())
+        self.assertEqual((modes.length(), frequency), (0, -1))
+
+    def test_bulk_operations(self):
+        # Tests put_many/get_many/remove_many on every map, and that a bulk
+        # insert resizes the table at most once
+        for module in (hash_map_sc, hash_map_oa, hash_map_rh, hash_map_soa):
+            m = module.HashMap(11, hash_function_2)
+            resizes = []
+            resize_table = m.resize_table
+            m.resize_table = lambda capacity: (resizes.append(capacity),
+                                               resize_table(capacity))
+
+            m.put_many([('key' + str(i), i) for i in range(1000)])
+            self.assertEqual(len(resizes), 1)
+            self.assertEqual(m.get_size(), 1000)
+
+            keys = DynamicArray(['key' + str(i) for i in range(0, 2000, 7)])
+            values = m.get_many(keys)
+            for idx in range(keys.length()):
+                i = int(keys[idx][3:])
+                self.assertEqual(values[idx], i if i < 1000 else None)
+
+            m.remove_many(keys)
+            self.assertEqual(m.get_size(), 1000 - len(range(0, 1000, 7)))
+            self.assertIsNone(m.get('key7'))
+            self.assertEqual(m.get('key8'), 8)
+
+    def test_seeded_hash_reference_values(self):
+        # Tests FNV-1a and SipHash-2-4 against their published test vectors
+        self.assertEqual(hash_seeded.fnv1a_64(''), 0xcbf29ce484222325)
+        self.assertEqual(hash_seeded.fnv1a_64('a'), 0xaf63dc4c8601ec8c)
+
+        k0 = int.from_bytes(bytes(range(8)), 'little')
+        k1 = int.from_bytes(bytes(range(8, 16)), 'little')
+        for length, expected in ((0, 0x726fdb47dd0e0e31),
+                                 (1, 0x74f839c593dc67fd),
+                                 (8, 0x93f5f5799a932462),
+                                 (15, 0xa129ca6149be45e5)):
+            self.assertEqual(
+                hash_seeded.siphash_2_4(bytes(range(length)), k0, k1),
+                expected)
+
+    def test_seeded_hash_functions_in_maps(self):
+        # Tests that the seeded hashes plug into every map, that fixed seeds
+        # are repeatable and that random seeds differ per function. The maps
+        # are checked with fixed seeds, so every run is the same.
+        for make, seed in ((hash_seeded.make_fnv1a, (7,)),
+                           (hash_seeded.make_murmur3, (7,)),
+                           (hash_seeded.make_siphash, (7, 9))):
+            self.assertEqual(make(*seed)('key'), make(*seed)('key'))
+            self.assertNotEqual(make()('key'), make()('key'))
+            for module in (hash_map_sc, hash_map_oa, hash_map_soa):
+                self.check_against_dict(module.HashMap(11, make(*seed)), 600)
+
+            # Ints are hashed by value, not as that many zero bytes
+            hash = make(*seed)
+            self.assertNotEqual(hash(3), hash(b'\0\0\0'))
+            self.assertNotEqual(hash(3), hash(4))
+            self.assertEqual(hash(-1), hash(b'\xff' * 8))
+            self.assertRaises(TypeError, hash, 3.0)
+
+        # Anagrams no longer pile up in one bucket
+        m = hash_map_sc.HashMap(101, hash_seeded.make_siphash(7, 9))
+        for key in (''.join(p) for p in itertools.permutations('12345')):
+            m.put(key, key)
+        self.assertGreater(m.get_capacity() - m.empty_buckets(), 50)
+
+    def test_nodes_are_slotted(self):
+        # Tests that the per-entry classes carry no per-instance __dict__
+        for obj in (SLNode('key', 1), HashEntry('key', 1), LinkedList(),
+                    iter(LinkedList())):
+            self.assertFalse(hasattr(obj, '__dict__'))
+
+    def test_batch_hashes_match_scalar(self):
+        # Tests that the batch hash functions agree with the scalar ones,
+        # including empty and non-ASCII keys
+        keys = ['', 'a', 'str12', 'str21', 'k\u00e9y', '\U0001f600' * 40]
+        keys += ['key' + str(i) * (i % 7) for i in range(500)]
+        self.assertEqual(hash_batch.hash_function_1_batch(keys),
+                         [hash_function_1(key) for key in keys])
+        self.assertEqual(hash_batch.hash_function_2_batch(keys),
+                         [hash_function_2(key) for key in keys])
+        self.assertEqual(hash_batch.hash_batch(keys, len),
+                         [len(key) for key in keys])
+
+    def test_find_mode(self):
+        # Tests find_mode with the batch-hashed insert path
+        da = DynamicArray(["2", "4", "2", "6", "8", "4", "1", "3", "4", "5",
+                           "7", "3", "3", "2"])
+        modes, frequency = hash_map_sc.find_mode(da)
+        self.assertEqual(frequency, 3)
+        self.assertEqual(sorted(modes[i] for i in range(modes.length())),
+                         ["2", "3", "4"])
+
+    def check_against_dict(self, m, steps: int = 3000) -> None:
+        # Runs random puts/removes on map m and a dict, checking they agree
+        rng = random.Random(261)
+        expected = {}
+        for step in range(steps):
+            key = 'str' + str(rng.randrange(300))
+            if rng.random() < 0.4:
+                m.remove(key)
+                expected.pop(key, None)
+            else:
+                m.put(key, step)
+                expected[key] = step
+        self.assertEqual(m.get_size(), len(expected))
+        for i in range(300):
+            key = 'str' + str(i)
+            self.assertEqual(m.get(key), expected.get(key))
+            self.assertEqual(m.contains_key(key), key in expected)
+
+    def test_rh_matches_dict(self):
+        # Tests the Robin Hood map against a dict over random puts/removes
+        m = hash_map_rh.HashMap(11, hash_function_1)
+        self.check_against_dict(m)
+        self.assertLessEqual(m.table_load(), 0.9)
+
+    def test_sc_incremental_resize(self):
+        # Tests that an incrementally resizing SC map matches a dict, and
+        # that the resize really is spread across many operations
+        m = hash_map_sc.HashMap(11, hash_function_1, incremental_resize=2)
+        self.check_against_dict(m)
+
+        m = hash_map_sc.HashMap(11, hash_function_1, incremental_resize=2)
+        saw_resizing = False
+        for i in range(200):
+            m.put('key' + str(i), i)
+            saw_resizing |= m._resizing
+        self.assertTrue(saw_resizing)
+        for i in range(200):
+            self.assertEqual(m.get('key' + str(i)), i)
+        m.resize_table(1)
+        self.assertFalse(m._resizing)
+        self.assertEqual(m.get_keys_and_values().length(), 200)
+
+    def test_sc_incremental_resize_keeps_load(self):
+        # Tests that an incremental resize keeps up with puts, so the load
+        # never goes above 1 and the table grows just like a one-shot resize
+        for step in (1, 4):
+            m = hash_map_sc.HashMap(11, hash_function_1,
+                                    incremental_resize=step)
+            max_load = 0
+            for i in range(20000):
+                m.put('key' + str(i), i)
+                max_load = max(max_load, m.table_load())
+            self.assertLessEqual(max_load, 1)
+
+            one_shot = hash_map_sc.HashMap(11, hash_function_1)
+            for i in range(20000):
+                one_shot.put('key' + str(i), i)
+            self.assertEqual(m.get_capacity(), one_shot.get_capacity())
+            for i in range(0, 20000, 7):
+                self.assertEqual(m.get('key' + str(i)), i)
+
+    def test_soa_matches_entry_map(self):
+        # Tests that the struct of arrays map lays out its table exactly
+        # like the HashEntry based map, and matches a dict
+        m = hash_map_oa.HashMap(10, hash_function_2)
+        soa = hash_map_soa.HashMap(10, hash_function_2)
+        for i in range(40):
+            m.put(str(i), i)
+            soa.put(str(i), i)
+            if i % 3 == 0:
+                m.remove(str(i // 2))
+                soa.remove(str(i // 2))
+        self.assertEqual(soa.get_capacity(), m.get_capacity())
+        for idx in range(m.get_capacity()):
+            entry = m._buckets[idx]
+            if entry is None:
+                self.assertEqual(soa._states[idx], hash_map_soa.EMPTY)
+            elif entry.is_tombstone:
+                self.assertEqual(soa._states[idx], hash_map_soa.DELETED)
+            else:
+                self.assertEqual(soa._keys[idx], entry.key)
+        self.assertEqual(soa.get_tombstones(), m.get_tombstones())
+        self.assertEqual([(e.key, e.value) for e in soa],
+                         [(e.key, e.value) for e in m])
+
+        for policy in capacity_policy.POLICIES:
+            soa = hash_map_soa.HashMap(11, hash_function_1,
+                                       capacity_policy=policy)
+            self.check_against_dict(soa)
+
+    def test_oa_usable_after_iteration(self):
+        # Tests that iterating an OA map does not break later lookups
+        for module in (hash_map_oa, hash_map_rh, hash_map_soa):
+            m = module.HashMap(11, hash_function_1)
+            m.put('key1', 10)
+            self.assertEqual([item.key for item in m], ['key1'])
+            self.assertEqual(m.get('key1'), 10)
+
+    def test_capacity_policies(self):
+        # Tests every map with every capacity policy against a dict, and
+        # that capacities follow the chosen policy
+        for module in (hash_map_sc, hash_map_oa, hash_map_rh):
+            for policy in capacity_policy.POLICIES:
+                m = module.HashMap(20, hash_function_2,
+                                   capacity_policy=policy)
+                self.check_against_dict(m)
+                capacity = m.get_capacity()
+                if policy == capacity_policy.POWER_OF_TWO:
+                    self.assertEqual(capacity & (capacity - 1), 0)
+                elif policy == capacity_policy.PRIME_TABLE:
+                    self.assertIn(capacity, capacity_policy.DOUBLING_PRIMES)
+                else:
+                    self.assertTrue(m._is_prime(capacity))
+
+        with self.assertRaises(ValueError):
+            hash_map_sc.HashMap(11, hash_function_1, capacity_policy='odd')
+
+    def test_rh_remove_leaves_no_tombstones(self):
+        # Tests that Robin Hood removal empties slots instead of tombstoning
+        m = hash_map_rh.HashMap(11, hash_function_1)
+        for i in range(9):
+            m.put('str' + str(i), i)
+        for i in range(9):
+            m.remove('str' + str(i))
+        self.assertEqual(m.empty_buckets(), m.get_capacity())
+        for idx in range(m.get_capacity()):
+            self.assertIsNone(m._buckets[idx])
+
+    def test_stats(self):
+        # Tests the stats counters, resize callbacks, and that disabling
+        # stats puts the class methods back
+        for module in (hash_map_sc, hash_map_oa, hash_map_rh, hash_map_soa):
+            m = module.HashMap(11, hash_function_1)
+            self.assertIsNone(m.get_stats())
+            stats = m.enable_stats()
+            resizes = []
+            stats.add_resize_callback(
+                lambda m, old, new, seconds: resizes.append((old, new)))
+
+            for i in range(50):
+                m.put('str' + str(i), i)
+            for i in range(10):
+                m.remove('str' + str(i))
+            for i in range(60):
+                m.get('str' + str(i))
+
+            report = m.get_stats()
+            self.assertEqual(report['puts'], 50)
+            self.assertEqual(report['gets'], 60)
+            self.assertEqual(report['removes'], 10)
+            self.assertEqual(report['hash_calls'], 120)
+            self.assertEqual(report['tombstones_created'],
+                             report['tombstones'])
+            self.assertEqual(sum(report['get_probe_lengths'].values()), 60)
+            self.assertEqual(report['resizes'], len(resizes))
+            self.assertGreater(report['collisions'], 0)
+            self.assertEqual(resizes[-1][1], m.get_capacity())
+
+            m.disable_stats()
+            self.assertIsNone(m.get_stats())
+            self.assertNotIn('_put_hashed', vars(m))
+            m.put('str0', 0)
+            self.assertEqual(stats.puts, 50)
+
+    def test_stats_put_probe_after_resize(self):
+        # Tests that every put records the probe it walked, including puts
+        # that first resize the table and so walk the resized one
+        for module in (hash_map_sc, hash_map_oa):
+            m = module.HashMap(11, hash_function_1)
+            stats = m.enable_stats()
+            for i in range(300):
+                key = 'key' + str(i)
+                probes = dict(stats.put_probes)
+                m.put(key, i)
+                length = [length for length, count in stats.put_probes.items()
+                          if count != probes.get(length, 0)]
+
+                # Nothing is removed, so a new key is put at the end of its
+                # probe sequence, or at the front of its chain
+                hash = hash_function_1(key)
+                if module is hash_map_sc:
+                    bucket = m._buckets[m._bucket_index(hash)]
+                    self.assertEqual(length, [bucket.length() - 1])
+                else:
+                    self.assertEqual(length,
+                                     [m._probe_length(key, hash)[0] - 1])
+
+    def test_sc_occupied_bucket_counter(self):
+        # Tests that the SC occupied bucket counter matches a full scan
+        # through puts, removes, resizes, treeified buckets and clear
+        for options in ({}, {'incremental_resize': 3},
+                        {'treeify_threshold': 4}):
+            m = hash_map_sc.HashMap(11, hash_function_1, **options)
+            rng = random.Random(261)
+            for step in range(2000):
+                key = 'key' + str(rng.randrange(300))
+                if rng.random() < 0.6:
+                    m.put(key, step)
+                else:
+                    m.remove(key)
+                if step % 400 == 399:
+                    m.resize_table(rng.randrange(1, 600))
+                if step == 1500:
+                    m.clear()
+
+                # Old buckets not yet migrated count as well
+                scan = sum(1 for idx in range(m._buckets.length())
+                           if m._buckets[idx].length() > 0)
+                if m._old_buckets is not None:
+                    scan += sum(1 for idx in range(m._migrate_idx,
+                                                   m._old_capacity)
+                                if m._old_buckets[idx].length() > 0)
+                self.assertEqual(m._occupied_buckets(), scan)
+
+                # empty_buckets is read straight from the counters, without
+                # finishing a migration in progress
+                migrate_idx = m._migrate_idx
+                self.assertEqual(m.empty_buckets(), m.get_capacity() - scan)
+                self.assertEqual(m._migrate_idx, migrate_idx)
+
+    def test_snapshot_round_trip(self):
+        # Tests that a saved OA map answers the same lookups from its
+        # memory mapped snapshot, for each open addressing map and policy
+        values = [None, -7, 2 ** 70, 1.5, 'text', b'raw', (1, 'two')]
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'map.snap')
+            for module in (hash_map_oa, hash_map_rh, hash_map_soa):
+                for policy in capacity_policy.POLICIES:
+                    m = module.HashMap(11, hash_function_2,
+                                       capacity_policy=policy)
+                    for i in range(300):
+                        m.put('key' + str(i), values[i % len(values)])
+                    for i in range(0, 300, 4):
+                        m.remove('key' + str(i))
+                    m.save(path)
+
+                    with hash_map_snapshot.open_mmap(
+                            path, hash_function_2) as snapshot:
+                        self.assertEqual(snapshot.get_size(), m.get_size())
+                        self.assertLess(snapshot.table_load(), 0.5)
+                        for i in range(320):
+                            key = 'key' + str(i)
+                            self.assertEqual(snapshot.contains_key(key),
+                                             m.contains_key(key))
+                            self.assertEqual(snapshot.get(key), m.get(key))
+                        pairs = snapshot.get_keys_and_values()
+                        self.assertEqual(
+                            sorted(pairs[idx][0]
+                                   for idx in range(pairs.length())),
+                            sorted('key' + str(i) for i in range(300)
+                                   if i % 4))
+
+            with open(path, 'wb') as file:
+                file.write(b'not a snapshot')
+            with self.assertRaises(ValueError):
+                hash_map_snapshot.open_mmap(path, hash_function_2)
+
+    def test_concurrent_map(self):
+        # Tests the concurrent map single threaded against a dict, then
+        # under the multi-threaded stress test
+        m = hash_map_concurrent.HashMap(11, hash_function_1, stripes=4)
+        self.check_against_dict(m)
+        scan = sum(1 for idx in range(m.get_capacity())
+                   if m._table.buckets[idx].length() > 0)
+        self.assertEqual(m.empty_buckets(), m.get_capacity() - scan)
+        m.clear()
+        self.assertEqual(m.get_size(), 0)
+        self.assertEqual(m.empty_buckets(), m.get_capacity())
+
+        self.assertEqual(bench_concurrent.stress(2000), [])
+
+    def test_bench_suite_baseline(self):
+        # Tests that regressions are flagged on p50/p99 latency as well as
+        # throughput, and that a bad baseline is refused before any run
+        old = {'map': 'oa', 'hash': 'fnv1a', 'workload': 'put',
+               'distribution': 'uniform', 'size': 100,
+               'ops_per_sec': 1000.0, 'p50_ns': 100, 'p99_ns': 1000}
+        new = dict(old, p99_ns=3000)
+        regressions = bench_suite.find_regressions(
+            {'results': [new]}, {'results': [old]}, 0.2, 0.5)
+        self.assertEqual(len(regressions), 1)
+        self.assertIn('p99', regressions[0])
+        self.assertEqual(bench_suite.find_regressions(
+            {'results': [old]}, {'results': [old]}, 0.2, 0.5), [])
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'baseline.json')
+            with open(path, 'w') as file:
+                file.write('{"results": [{"map": "oa"}]}')
+            for baseline in (path, os.path.join(directory, 'missing.json')):
+                start = time.perf_counter()
+                with contextlib.redirect_stderr(io.StringIO()), \
+                        self.assertRaises(SystemExit):
+                    bench_suite.main(['--baseline', baseline])
+                self.assertLess(time.perf_counter() - start, 1)
+
+    def test_views_and_nested_iteration(self):
+        # Tests the lazy views of each map, and that nested traversals of
+        # the OA maps each keep their own place
+        for m in (hash_map_sc.HashMap(11, hash_function_1),
+                  hash_map_sc.HashMap(11, hash_function_1,
+                                      incremental_resize=2),
+                  hash_map_oa.HashMap(11, hash_function_1),
+                  hash_map_rh.HashMap(11, hash_function_1),
+                  hash_map_soa.HashMap(11, hash_function_1)):
+            for i in range(40):
+                m.put('str' + str(i), i)
+            m.remove('str0')
+            expected = {'str' + str(i): i for i in range(1, 40)}
+
+            self.assertEqual(dict(m.items()), expected)
+            self.assertEqual(sorted(m.keys()), sorted(expected))
+            self.assertEqual(sorted(m.values()), sorted(expected.values()))
+            self.assertEqual(len(m.keys()), 39)
+            self.assertIn('str5', m.keys())
+            self.assertNotIn('str0', m.keys())
+            self.assertIn(('str5', 5), m.items())
+            self.assertNotIn(('str5', 6), m.items())
+
+            # A view can be traversed any number of times
+            keys = m.keys()
+            self.assertEqual(list(keys), list(keys))
+
+        for module in (hash_map_oa, hash_map_soa):
+            m = module.HashMap(11, hash_function_1)
+            for i in range(10):
+                m.put('str' + str(i), i)
+            pairs = [(outer.key, inner.key) for outer in m for inner in m]
+            self.assertEqual(len(pairs), 100)
+
+    def test_shrink_on_delete(self):
+        # Tests that draining a map with a low-water mark shrinks it back to
+        # its starting capacity, and that the default never shrinks
+        for make_map in (
+                lambda **kw: hash_map_sc.HashMap(11, hash_function_2, **kw),
+                lambda **kw: hash_map_oa.HashMap(11, hash_function_2, **kw),
+                lambda **kw: hash_map_rh.HashMap(11, hash_function_2, **kw),
+                lambda **kw: hash_map_soa.HashMap(11, hash_function_2,
+                                                  **kw)):
+            m = make_map(shrink_load=0.1)
+            start = m.get_capacity()
+            self.check_against_dict(m)
+            for i in range(2000):
+                m.put('str' + str(i), i)
+            grown = m.get_capacity()
+
+            # Capacity only ever goes down while draining, and the load
+            # stays at or above the low-water mark until the floor
+            capacities = [grown]
+            for i in range(1990):
+                m.remove('str' + str(i))
+                capacities.append(m.get_capacity())
+                if m.get_capacity() > start:
+                    self.assertGreaterEqual(m.table_load(), 0.1)
+            self.assertEqual(capacities, sorted(capacities, reverse=True))
+            self.assertLess(m.get_capacity(), grown // 10)
+            for i in range(1990, 2000):
+                self.assertEqual(m.get('str' + str(i)), i)
+
+            # Bulk removal shrinks once, at the end
+            m.remove_many(['str' + str(i) for i in range(1990, 2000)])
+            self.assertEqual(m.get_capacity(), start)
+
+            m.put_many([('str' + str(i), i) for i in range(500)])
+            m.clear()
+            self.assertEqual(m.get_capacity(), start)
+
+            m = make_map()
+            for i in range(200):
+                m.put('str' + str(i), i)
+            capacity = m.get_capacity()
+            for i in range(200):
+                m.remove('str' + str(i))
+            m.clear()
+            self.assertEqual(m.get_capacity(), capacity)
+
+        with self.assertRaises(ValueError):
+            hash_map_sc.HashMap(11, hash_function_1, shrink_load=0.5)
+        with self.assertRaises(ValueError):
+            hash_map_oa.HashMap(11, hash_function_1, shrink_load=0.25)
+        hash_map_rh.HashMap(11, hash_function_1, shrink_load=0.4)
+
+    def test_int_map(self):
+        # Tests the integer key map against a dict, under each capacity
+        # policy, with negative and full 64-bit keys
+        for policy in capacity_policy.POLICIES:
+            m = hash_map_int.HashMap(11, capacity_policy=policy)
+            rng = random.Random(261)
+            keys = [rng.randrange(-2 ** 63, 2 ** 63) for _ in range(200)]
+            keys += list(range(-50, 50))
+            expected = {}
+            for step in range(4000):
+                key = rng.choice(keys)
+                if rng.random() < 0.4:
+                    m.remove(key)
+                    expected.pop(key, None)
+                else:
+                    m.put(key, step)
+                    expected[key] = step
+                if step == 2000:
+                    m.resize_table(7)
+
+            self.assertEqual(m.get_size(), len(expected))
+            for key in keys:
+                self.assertEqual(m.get(key), expected.get(key))
+                self.assertEqual(m.contains_key(key), key in expected)
+            pairs = m.get_keys_and_values()
+            self.assertEqual(dict(pairs[idx] for idx in
+                                  range(pairs.length())), expected)
+
+        # Keys that do not fit in 64 bits are refused without side effects
+        with self.assertRaises(ValueError):
+            m.put(2 ** 63, 'big')
+        self.assertEqual(m.get_size(), len(expected))
+        self.assertIsNone(m.get(2 ** 63))
+
+        # The str keyed snapshot format is refused up front
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'map.snap')
+            with self.assertRaises(TypeError):
+                m.save(path)
+            self.assertFalse(os.path.exists(path))
+
+    def test_bulk_resize_matches_one_at_a_time(self):
+        # Tests that resizing through the vectorized grouping gives the same
+        # chains (SC) and contents (OA maps) as resizing without NumPy
+        def build(make_map):
+            m = make_map()
+            for i in range(3000):
+                m.put('str' + str(i), i)
+            for i in range(0, 3000, 3):
+                m.remove('str' + str(i))
+            m.resize_table(5000)
+            return m
+
+        makers = [
+            lambda: hash_map_sc.HashMap(11, hash_function_1),
+            lambda: hash_map_sc.HashMap(11, hash_function_1,
+                                        treeify_threshold=8),
+            lambda: hash_map_sc.HashMap(
+                11, hash_function_2,
+                capacity_policy=capacity_policy.POWER_OF_TWO),
+            lambda: hash_map_oa.HashMap(11, hash_function_2),
+            lambda: hash_map_soa.HashMap(
+                11, hash_function_2,
+                capacity_policy=capacity_policy.POWER_OF_TWO),
+        ]
+        for make_map in makers:
+            bulk = build(make_map)
+            numpy, hash_batch.np = hash_batch.np, None
+            try:
+                single = build(make_map)
+            finally:
+                hash_batch.np = numpy
+
+            if isinstance(bulk, hash_map_sc.HashMap):
+                self.assertEqual(str(bulk), str(single))
+                self.assertEqual(bulk.empty_buckets(), single.empty_buckets())
+            self.assertEqual(dict(bulk.items()), dict(single.items()))
+            for i in range(3000):
+                self.assertEqual(bulk.get('str' + str(i)),
+                                 single.get('str' + str(i)))
+
+        # Hashes that do not fit in a uint64 are left to the scalar path
+        hashes = list(range(1000))
+        for bad in (-1, 1 << 64):
+            self.assertIsNone(hash_batch.group_by_bucket(
+                hashes + [bad], 11, False))
+
+        # Including negative ones, as from the built in hash
+        m = hash_map_sc.HashMap(11, lambda key: -hash_function_2(key) - 1)
+        self.check_against_dict(m)
+
+    def test_bloom_filter(self):
+        # Tests that maps with a Bloom filter still match a dict, and that
+        # the filter never misses a key and skips most absent ones
+        makers = [
+            lambda **kw: hash_map_sc.HashMap(11, hash_function_2, **kw),
+            lambda **kw: hash_map_sc.HashMap(11, hash_function_2,
+                                             incremental_resize=2, **kw),
+            lambda **kw: hash_map_oa.HashMap(11, hash_function_2, **kw),
+            lambda **kw: hash_map_rh.HashMap(11, hash_function_2, **kw),
+            lambda **kw: hash_map_soa.HashMap(11, hash_function_2, **kw),
+        ]
+        for make_map in makers:
+            m = make_map(bloom_fp_rate=0.01, shrink_load=0.1)
+            self.check_against_dict(m)
+            self.assertEqual(len(m.get_bloom_filter()), m.get_size())
+
+            m = make_map(bloom_fp_rate=0.01)
+            m.put_many([('str' + str(i), i) for i in range(2000)])
+            m.remove_many(['str' + str(i) for i in range(0, 2000, 2)])
+            for i in range(1, 2000, 2):
+                self.assertEqual(m.get('str' + str(i)), i)
+            self.assertEqual(len(m.get_bloom_filter()), 1000)
+
+            bloom = m.get_bloom_filter()
+            passed = sum(bloom.might_contain(m._hash('miss' + str(i)))
+                         for i in range(2000))
+            self.assertLess(passed, 100)
+            self.assertLess(bloom.false_positive_rate(), 0.05)
+            self.assertEqual(m.get_many(['miss1', 'str1']).length(), 2)
+
+            m.clear()
+            self.assertEqual(len(m.get_bloom_filter()), 0)
+            self.assertIsNone(m.get('str1'))
+            self.assertIsNone(make_map().get_bloom_filter())
+
+        with self.assertRaises(ValueError):
+            hash_map_oa.HashMap(11, hash_function_2, bloom_fp_rate=1.5)
+
+    def test_lru_cache(self):
+        # Tests that a bounded SC map evicts the least recently used key,
+        # counts hits, misses and evictions, and never grows its table
+        for kw in ({}, {'bloom_fp_rate': 0.01},
+                   {'chain_policy': MOVE_TO_FRONT}):
+            m = hash_map_sc.HashMap(11, hash_function_2, max_entries=100,
+                                    **kw)
+            capacity = m.get_capacity()
+            self.assertGreater(capacity, 100)
+
+            # Mirror the cache with a dict kept in recency order
+            rng = random.Random(261)
+            expected = {}
+            for step in range(5000):
+                key = 'str' + str(rng.randrange(300))
+                choice = rng.random()
+                if choice < 0.4:
+                    self.assertEqual(m.get(key), expected.get(key))
+                    if key in expected:
+                        expected[key] = expected.pop(key)
+                elif choice < 0.5:
+                    m.remove(key)
+                    expected.pop(key, None)
+                else:
+                    m.put(key, step)
+                    expected.pop(key, None)
+                    expected[key] = step
+                    if len(expected) > 100:
+                        del expected[next(iter(expected))]
+            self.assertEqual(dict(m.items()), expected)
+            self.assertEqual(m.get_capacity(), capacity)
+
+            # An explicit resize keeps the recency order
+            m.resize_table(1000)
+            m.put('new', 0)
+            self.assertNotIn(next(iter(expected)), m.keys())
+
+        m = hash_map_sc.HashMap(11, hash_function_2, max_entries=2)
+        m.put('a', 1)
+        m.put('b', 2)
+        m.get('a')
+        m.put_many([('c', 3), ('d', 4)])
+        m.get('b')
+        self.assertEqual(sorted(m.keys()), ['c', 'd'])
+        self.assertEqual(m.get_cache_stats(),
+                         {'hits': 1, 'misses': 1, 'evictions': 2,
+                          'size': 2, 'max_entries': 2})
+        m.clear()
+        m.put('e', 5)
+        self.assertEqual(list(m.items()), [('e', 5)])
+
+        with self.assertRaises(ValueError):
+            hash_map_sc.HashMap(11, hash_function_2, max_entries=10,
+                                incremental_resize=2)
+
+    def test_timing_wheel(self):
+        # Tests that timers fire on the first advance at or after their
+        # deadline, across cascades, long idle jumps and cancels
+        now = [0.0]
+        wheel = timing_wheel.TimingWheel(1.0, lambda: now[0])
+        rng = random.Random(261)
+        pending = {}
+        for step in range(3000):
+            if rng.random() < 0.5:
+                ttl = rng.choice((1, 63, 64, 65, 4095, 4097, 300000,
+                                  timing_wheel._SPAN * 2)) * rng.random()
+                ttl += 0.5
+                timer = wheel.schedule(step, None, ttl)
+                pending[timer] = now[0] + ttl
+            elif pending and rng.random() < 0.2:
+                timer = rng.choice(list(pending))
+                wheel.cancel(timer)
+                del pending[timer]
+            else:
+                now[0] += rng.choice((0.3, 1, 50, 5000, 10 ** 6))
+                fired = set(wheel.advance())
+                due = {timer for timer, deadline in pending.items()
+                       if deadline <= now[0] // 1}
+                self.assertEqual(fired, due)
+                for timer in fired:
+                    del pending[timer]
+            self.assertEqual(len(wheel), len(pending))
+
+    def test_ttl(self):
+        # Tests that keys put with a ttl turn into misses once it runs out,
+        # while other keys (and those made permanent again) stay. The maps
+        # run on a clock that only moves when the test moves it.
+        now = [1000.0]
+
+        def clock():
+            return now[0]
+
+        makers = [
+            lambda: hash_map_sc.HashMap(11, hash_function_2, clock=clock),
+            lambda: hash_map_sc.HashMap(11, hash_function_2,
+                                        max_entries=1000, bloom_fp_rate=0.01,
+                                        clock=clock),
+            lambda: hash_map_oa.HashMap(11, hash_function_2, clock=clock),
+            lambda: hash_map_rh.HashMap(11, hash_function_2, clock=clock),
+            lambda: hash_map_soa.HashMap(11, hash_function_2, clock=clock),
+        ]
+        for make_map in makers:
+            m = make_map()
+            m.put_many([('str' + str(i), i) for i in range(200)], ttl=0.05)
+            for i in range(200, 400):
+                m.put('str' + str(i), i, ttl=60)
+            for i in range(400, 500):
+                m.put('str' + str(i), i)
+            m.put('str0', 0)
+            m.put('str1', 1, ttl=60)
+            m.put('str401', 401, ttl=0.05)
+            m.remove('str2')
+
+            # Nothing expires until the clock reaches the ttl
+            now[0] += 0.04
+            self.assertEqual(m.get('str3'), 3)
+            now[0] += 0.06
+
+            expected = {'str' + str(i): i for i in range(200, 500)}
+            expected.update({'str0': 0, 'str1': 1})
+            del expected['str401']
+            self.assertIsNone(m.get('str3'))
+            self.assertFalse(m.contains_key('str401'))
+            self.assertEqual(m.get('str200'), 200)
+            self.assertEqual(m.get_size(), len(expected))
+            self.assertEqual(dict(m.items()), expected)
+
+            # Expired keys can be put again
+            m.put('str3', 3)
+            self.assertEqual(m.get('str3'), 3)
+            with self.assertRaises(ValueError):
+                m.put('str4', 4, ttl=0)
+            m.clear()
+            self.assertIsNone(m.get('str200'))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,185 @@
+# Name: Tom Haney
+# Course: CS261 - Data Structures
+# Description: Seeded 64-bit hash functions for use as the function argument
+#  of either HashMap, as better alternatives to hash_function_1/2:
+#   - fnv1a_64: FNV-1a over the UTF-8 bytes of the key
+#   - murmur3_64: MurmurHash3 style block mixing with the fmix64 finalizer
+#   - siphash_2_4: SipHash-2-4, a keyed hash designed against hash flooding
+#  Each takes an optional seed (or 128-bit key for SipHash). The make_*
+#  functions return a single argument hash function with that seed bound,
+#  drawing a random one when no seed is given, so that every map can be
+#  given its own:
+#
+#      m = HashMap(11, make_siphash())
+#
+#  Keys may be str (hashed as UTF-8), bytes-like, or int (hashed as the 8
+#  little-endian bytes of their low 64 bits, so they suit hash_map_int too).
+#
+#  Only SipHash with a secret random key protects against attacker chosen
+#  keys; seeded FNV-1a and MurmurHash3 have seed-independent collisions.
+
+import secrets
+import struct
+
+from capacity_policy import fmix64
+
+
+_MASK_64 = (1 << 64) - 1
+
+_FNV_OFFSET_BASIS = 0xcbf29ce484222325
+_FNV_PRIME = 0x100000001b3
+
+_MURMUR_C1 = 0x87c37b91114253d5
+_MURMUR_C2 = 0x4cf5ad432745937f
+
+
+def _to_bytes(key) -> bytes:
+    """
+    Returns the UTF-8 bytes of a str key, or the 8 little-endian bytes of
+      the low 64 bits of an int key. bytes-like keys are used as they are.
+    """
+    if isinstance(key, str):
+        return key.encode('utf-8', 'surrogatepass')
+    if isinstance(key, int):
+        return (key & _MASK_64).to_bytes(8, 'little')
+    if isinstance(key, (bytes, bytearray, memoryview)):
+        return bytes(key)
+    raise TypeError("key must be str, bytes-like or int, not " +
+                    type(key).__name__)
+
+
+def _rotl(value: int, bits: int) -> int:
+    """
+    Rotates a 64-bit value left by bits.
+    """
+    return ((value << bits) | (value >> (64 - bits))) & _MASK_64
+
+
+def fnv1a_64(key, seed: int = 0) -> int:
+    """
+    64-bit FNV-1a hash of key, with the seed folded into the offset basis.
+    """
+    hash = (_FNV_OFFSET_BASIS ^ seed) & _MASK_64
+    for byte in _to_bytes(key):
+        hash = ((hash ^ byte) * _FNV_PRIME) & _MASK_64
+    return hash
+
+
+def murmur3_64(key, seed: int = 0) -> int:
+    """
+    64-bit MurmurHash3 style hash of key. Mixes the key 8 bytes at a time
+      with the MurmurHash3 x64 block constants and finishes with fmix64.
+    """
+    data = _to_bytes(key)
+    hash = (seed ^ (len(data) * _MURMUR_C1)) & _MASK_64
+
+    # Whole 8-byte blocks
+    block_end = len(data) - len(data) % 8
+    for (block,) in struct.iter_unpack('<Q', data[:block_end]):
+        block = (block * _MURMUR_C1) & _MASK_64
+        block = (_rotl(block, 31) * _MURMUR_C2) & _MASK_64
+        hash ^= block
+        hash = (_rotl(hash, 27) * 5 + 0x52dce729) & _MASK_64
+
+    # Remaining 0-7 bytes
+    tail = int.from_bytes(data[block_end:], 'little')
+    if tail:
+        tail = (tail * _MURMUR_C1) & _MASK_64
+        hash ^= (_rotl(tail, 31) * _MURMUR_C2) & _MASK_64
+
+    return fmix64(hash ^ len(data))
+
+
+def _sip_rounds(v0: int, v1: int, v2: int, v3: int, rounds: int) -> tuple:
+    """
+    Applies rounds SipRounds to the SipHash state and returns the new state.
+    """
+    for _ in range(rounds):
+        v0 = (v0 + v1) & _MASK_64
+        v1 = _rotl(v1, 13) ^ v0
+        v0 = _rotl(v0, 32)
+        v2 = (v2 + v3) & _MASK_64
+        v3 = _rotl(v3, 16) ^ v2
+        v0 = (v0 + v3) & _MASK_64
+        v3 = _rotl(v3, 21) ^ v0
+        v2 = (v2 + v1) & _MASK_64
+        v1 = _rotl(v1, 17) ^ v2
+        v2 = _rotl(v2, 32)
+    return v0, v1, v2, v3
+
+
+def siphash_2_4(key, k0: int = 0, k1: int = 0) -> int:
+    """
+    SipHash-2-4 of key under the 128-bit secret key (k0, k1), each half
+      given as a 64-bit integer.
+    """
+    data = _to_bytes(key)
+    v0 = k0 ^ 0x736f6d6570736575
+    v1 = k1 ^ 0x646f72616e646f6d
+    v2 = k0 ^ 0x6c7967656e657261
+    v3 = k1 ^ 0x7465646279746573
+
+    # Whole 8-byte blocks, then the tail with the length in the top byte
+    block_end = len(data) - len(data) % 8
+    blocks = [block for (block,) in
+              struct.iter_unpack('<Q', data[:block_end])]
+    blocks.append(int.from_bytes(data[block_end:], 'little') |
+                  ((len(data) & 0xff) << 56))
+
+    for block in blocks:
+        v3 ^= block
+        v0, v1, v2, v3 = _sip_rounds(v0, v1, v2, v3, 2)
+        v0 ^= block
+
+    v2 ^= 0xff
+    v0, v1, v2, v3 = _sip_rounds(v0, v1, v2, v3, 4)
+    return v0 ^ v1 ^ v2 ^ v3
+
+
+def _random_seed() -> int:
+    """
+    Returns a random 64-bit seed from the operating system's CSPRNG.
+    """
+    return secrets.randbits(64)
+
+
+def make_fnv1a(seed: int = None):
+    """
+    Returns fnv1a_64 as a single argument hash function with seed bound
+      (a random one if seed is None).
+    """
+    if seed is None:
+        seed = _random_seed()
+
+    def hash_function(key) -> int:
+        return fnv1a_64(key, seed)
+    return hash_function
+
+
+def make_murmur3(seed: int = None):
+    """
+    Returns murmur3_64 as a single argument hash function with seed bound
+      (a random one if seed is None).
+    """
+    if seed is None:
+        seed = _random_seed()
+
+    def hash_function(key) -> int:
+        return murmur3_64(key, seed)
+    return hash_function
+
+
+def make_siphash(k0: int = None, k1: int = None):
+    """
+    Returns siphash_2_4 as a single argument hash function with the key
+      (k0, k1) bound. Any half that is None is drawn at random, which is
+      what makes the map resistant to flooding with chosen keys.
+    """
+    if k0 is None:
+        k0 = _random_seed()
+    if k1 is None:
+        k1 = _random_seed()
+
+    def hash_function(key) -> int:
+        return siphash_2_4(key, k0, k1)
+    return hash_function
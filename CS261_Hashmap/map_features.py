@@ -0,0 +1,141 @@
+# Name: Tom Haney
+# Course: CS261 - Data Structures
+# Description: Methods shared by the chaining and open addressing HashMaps
+#  for their optional features: keeping the Bloom filter and the timing
+#  wheel of key expiries in step with puts and removes, the lazy views and
+#  the stats hooks. Both maps inherit them from MapFeatures, and supply the
+#  table specific parts themselves:
+#   - _put_hashed, _get_hashed and _remove_hashed, given a key's full hash
+#   - _entries, a generator over the stored nodes or entries
+#   - _rebuild_bloom, which sizes the filter for the map's own growth rule
+#  along with the _size, _hash_function, _clock, _bloom, _wheel, _timers and
+#  _stats attributes.
+
+import map_stats
+from bloom_filter import CountingBloomFilter
+from map_views import ItemsView, KeysView, ValuesView
+from timing_wheel import TimingWheel
+
+
+class MapFeatures:
+    """
+    Mixin of the Bloom filter, expiry, view and stats methods of a HashMap
+    """
+
+    def _bloom_put(self, key: str, value: object, hash: int) -> None:
+        """
+        Does the work of put while a Bloom filter is kept, adding the hash
+          of a key that was not in the hash map to it.
+        """
+        size = self._size
+        self._put_hashed(key, value, hash)
+        if self._size > size:
+            self._bloom.add(hash)
+
+    def _bloom_remove(self, key: str, hash: int) -> None:
+        """
+        Does the work of remove while a Bloom filter is kept, taking the
+          hash of a key that was removed back out of it.
+        """
+        size = self._size
+        self._remove_hashed(key, hash)
+        if self._size < size:
+            self._bloom.remove(hash)
+
+    def _remove_key(self, key: str, hash: int) -> None:
+        """
+        Does the work of remove while a Bloom filter or expiry is kept,
+          keeping both in step.
+        """
+        if self._wheel is not None:
+            self._set_expiry(key, hash, None)
+        if self._bloom is None:
+            self._remove_hashed(key, hash)
+        else:
+            self._bloom_remove(key, hash)
+
+    def _set_expiry(self, key: str, hash: int, ttl: float) -> None:
+        """
+        Gives key a time to live of ttl seconds from now, replacing any it
+          had. With ttl None, just stops any it had. The timers are kept in
+          a plain map of the same kind, indexed by the key's hash.
+        """
+        if self._wheel is None:
+            if ttl is None:
+                return
+            self._wheel = TimingWheel(clock=self._clock)
+            self._timers = type(self)(11, self._hash_function)
+
+        timer = self._timers._get_hashed(key, hash)
+        if timer is not None:
+            self._wheel.cancel(timer)
+        if ttl is not None:
+            self._timers._put_hashed(
+                key, self._wheel.schedule(key, hash, ttl), hash)
+        elif timer is not None:
+            self._timers._remove_hashed(key, hash)
+
+    def _expire(self) -> None:
+        """
+        Removes the keys whose time to live has run out, as reaped by the
+          ticks of the timing wheel since the last call.
+        """
+        for timer in self._wheel.advance():
+            self._timers._remove_hashed(timer.key, timer.hash)
+            self._remove_key(timer.key, timer.hash)
+
+    def get_bloom_filter(self) -> CountingBloomFilter:
+        """
+        Returns the Bloom filter kept in front of the table, or None.
+        """
+        return self._bloom
+
+    def keys(self) -> KeysView:
+        """
+        Returns a view of the keys, which walks the table lazily each time
+          it is iterated.
+        """
+        if self._wheel is not None:
+            self._expire()
+        return KeysView(self)
+
+    def values(self) -> ValuesView:
+        """
+        Returns a view of the values, which walks the table lazily each time
+          it is iterated.
+        """
+        if self._wheel is not None:
+            self._expire()
+        return ValuesView(self)
+
+    def items(self) -> ItemsView:
+        """
+        Returns a view of the (key, value) tuples, which walks the table
+          lazily each time it is iterated.
+        """
+        if self._wheel is not None:
+            self._expire()
+        return ItemsView(self)
+
+    def enable_stats(self) -> map_stats.MapStats:
+        """
+        Starts gathering probe, collision, tombstone (open addressing only),
+          resize and hashing statistics, returning the MapStats they are
+          kept in (see map_stats.py).
+        """
+        return map_stats.enable(self)
+
+    def disable_stats(self) -> None:
+        """
+        Stops gathering statistics. Disabled stats cost nothing.
+        """
+        map_stats.disable(self)
+
+    def get_stats(self) -> dict:
+        """
+        Returns a report of the statistics gathered so far, or None if stats
+          are not enabled.
+        """
+        if self._stats is None:
+            return None
+        return self._stats.report(self)
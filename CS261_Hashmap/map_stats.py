@@ -0,0 +1,245 @@
+# Name: Tom Haney
+# Course: CS261 - Data Structures
+# Description: Optional live statistics for either HashMap. Enabling stats on
+#  a map shadows a few of its internal methods with timing and counting
+#  wrappers on that one instance; disabling them deletes the wrappers again.
+#  A map without stats enabled runs the class methods untouched, so the hot
+#  path costs exactly what it did before.
+#
+#      stats = m.enable_stats()
+#      stats.add_resize_callback(print)
+#      ...
+#      report = m.get_stats()
+#      m.disable_stats()
+#
+#  The report holds:
+#   - the current size, capacity, load, tombstones and occupied buckets,
+#     all read from counters the map keeps anyway
+#   - histograms of probe lengths per get and per put, the number of
+#     occupied slots (or chain nodes) looked at for each one
+#   - a histogram of chain lengths: bucket lengths for the chaining map, and
+#     the probe length of every live key for the open addressing maps
+#   - counts of gets, puts, collisions (puts that had to look past another
+#     key), removes, tombstones created and resizes
+#   - time spent resizing and hashing
+#  Resize callbacks are called as callback(map, old_capacity, new_capacity,
+#  seconds) after each resize.
+
+import time
+
+
+# Internal methods of the map shadowed by enable()
+_WRAPPED = ('_hash', '_hash_keys', '_put_hashed', '_get_hashed',
+            '_remove_hashed', 'resize_table', '_start_resize', '_resize_step',
+            '_switch_buckets')
+
+
+def _histogram(values) -> dict:
+    """
+    Returns {value: count} for values, ordered by value.
+    """
+    counts = {}
+    for value in values:
+        counts[value] = counts.get(value, 0) + 1
+    return dict(sorted(counts.items()))
+
+
+class MapStats:
+    """
+    Counters gathered from one HashMap while its stats are enabled.
+    """
+
+    def __init__(self) -> None:
+        self.get_probes = {}
+        self.put_probes = {}
+        self.gets = 0
+        self.puts = 0
+        self.collisions = 0
+        self.removes = 0
+        self.tombstones_created = 0
+        self.resizes = 0
+        self.resize_seconds = 0.0
+        self.hash_calls = 0
+        self.hash_seconds = 0.0
+        self._resize_callbacks = []
+
+        # Set while inside resize_table, so nested steps are not timed twice
+        self._in_resize = False
+
+        # Key and hash of the put in progress, and its probe length. A put
+        # that resizes walks the resized table, so it is measured again
+        self._put_key = None
+        self._put_probe = (0, False)
+
+    def add_resize_callback(self, callback) -> None:
+        """
+        Registers callback(map, old_capacity, new_capacity, seconds) to be
+          called after every resize.
+        """
+        self._resize_callbacks.append(callback)
+
+    def remove_resize_callback(self, callback) -> None:
+        """
+        Unregisters a callback added with add_resize_callback.
+        """
+        self._resize_callbacks.remove(callback)
+
+    def _resized(self, map, old_capacity: int, seconds: float) -> None:
+        """
+        Records one resize and notifies the resize callbacks.
+        """
+        self.resizes += 1
+        self.resize_seconds += seconds
+        for callback in self._resize_callbacks:
+            callback(map, old_capacity, map.get_capacity(), seconds)
+
+    def _remeasure_put(self, map) -> None:
+        """
+        Measures the probe of any put in progress again, after the table it
+          is about to walk has been resized.
+        """
+        if self._put_key is not None:
+            self._put_probe = map._probe_length(*self._put_key)
+
+    def report(self, map) -> dict:
+        """
+        Returns the counters together with a snapshot of map's current
+          size, capacity, tombstones and chain lengths.
+        """
+        return {
+            'size': map.get_size(),
+            'capacity': map.get_capacity(),
+            'tombstones': getattr(map, '_tombstones', 0),
+            'occupied_buckets': map._occupied_buckets(),
+            'load': map.table_load(),
+            'gets': self.gets,
+            'puts': self.puts,
+            'removes': self.removes,
+            'collisions': self.collisions,
+            'tombstones_created': self.tombstones_created,
+            'resizes': self.resizes,
+            'resize_seconds': self.resize_seconds,
+            'hash_calls': self.hash_calls,
+            'hash_seconds': self.hash_seconds,
+            'get_probe_lengths': dict(sorted(self.get_probes.items())),
+            'put_probe_lengths': dict(sorted(self.put_probes.items())),
+            'chain_lengths': _histogram(map._chain_lengths()),
+        }
+
+
+def enable(map) -> MapStats:
+    """
+    Starts gathering stats on map, returning the MapStats they go into.
+      Stats that are already enabled are left running and returned.
+    """
+    if map._stats is not None:
+        return map._stats
+
+    stats = MapStats()
+    clock = time.perf_counter
+    # The class methods, bound to map, that the wrappers call through to
+    original = {name: getattr(map, name) for name in _WRAPPED
+                if hasattr(map, name)}
+
+    def _hash(key):
+        start = clock()
+        hash = original['_hash'](key)
+        stats.hash_seconds += clock() - start
+        stats.hash_calls += 1
+        return hash
+
+    def _hash_keys(keys):
+        start = clock()
+        hashes = original['_hash_keys'](keys)
+        stats.hash_seconds += clock() - start
+        stats.hash_calls += len(hashes)
+        return hashes
+
+    def _put_hashed(key, value, hash):
+        stats._put_key = (key, hash)
+        stats._put_probe = map._probe_length(key, hash)
+        try:
+            original['_put_hashed'](key, value, hash)
+        finally:
+            stats._put_key = None
+        length, found = stats._put_probe
+        stats.put_probes[length] = stats.put_probes.get(length, 0) + 1
+        stats.puts += 1
+        if length > found:
+            stats.collisions += 1
+
+    def _get_hashed(key, hash):
+        length, _ = map._probe_length(key, hash)
+        stats.get_probes[length] = stats.get_probes.get(length, 0) + 1
+        stats.gets += 1
+        return original['_get_hashed'](key, hash)
+
+    def _remove_hashed(key, hash):
+        tombstones = getattr(map, '_tombstones', 0)
+        original['_remove_hashed'](key, hash)
+        stats.removes += 1
+        stats.tombstones_created += max(0, getattr(map, '_tombstones', 0) -
+                                        tombstones)
+
+    def resize_table(new_capacity):
+        if stats._in_resize:
+            return original['resize_table'](new_capacity)
+        old_capacity = map.get_capacity()
+        stats._in_resize = True
+        start = clock()
+        try:
+            original['resize_table'](new_capacity)
+        finally:
+            stats._in_resize = False
+        stats._resized(map, old_capacity, clock() - start)
+        stats._remeasure_put(map)
+
+    # Incremental resizes (chaining map only) are counted when they start,
+    # and their steps timed as they happen
+    def _start_resize(new_capacity):
+        old_capacity = map.get_capacity()
+        start = clock()
+        original['_start_resize'](new_capacity)
+        stats.resizes += 1
+        stats.resize_seconds += clock() - start
+        for callback in stats._resize_callbacks:
+            callback(map, old_capacity, map._resize_capacity, 0.0)
+
+    def _resize_step():
+        if stats._in_resize:
+            return original['_resize_step']()
+        start = clock()
+        original['_resize_step']()
+        stats.resize_seconds += clock() - start
+
+    def _switch_buckets():
+        original['_switch_buckets']()
+        stats._remeasure_put(map)
+
+    wrappers = {
+        '_hash': _hash,
+        '_hash_keys': _hash_keys,
+        '_put_hashed': _put_hashed,
+        '_get_hashed': _get_hashed,
+        '_remove_hashed': _remove_hashed,
+        'resize_table': resize_table,
+        '_start_resize': _start_resize,
+        '_resize_step': _resize_step,
+        '_switch_buckets': _switch_buckets,
+    }
+    for name in original:
+        setattr(map, name, wrappers[name])
+
+    map._stats = stats
+    return stats
+
+
+def disable(map) -> None:
+    """
+    Stops gathering stats on map, restoring its class methods.
+    """
+    if map._stats is None:
+        return
+    for name in _WRAPPED:
+        map.__dict__.pop(name, None)
+    map._stats = None
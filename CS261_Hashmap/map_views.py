@@ -0,0 +1,65 @@
+# Name: Tom Haney
+# Course: CS261 - Data Structures
+# Description: Lazy keys, values and items views over either HashMap. A view
+#  holds nothing but the map: each traversal of it is a new generator that
+#  walks the map's table (through the map's _entries method) as it goes,
+#  instead of copying every pair out first. Like dict views, they reflect
+#  the map as it is when used, and changing the map during a traversal
+#  leaves that traversal undefined.
+
+class _MapView:
+    """
+    Base of the views: sized, and iterable any number of times
+    """
+
+    __slots__ = ('_map',)
+
+    def __init__(self, map) -> None:
+        self._map = map
+
+    def __len__(self) -> int:
+        return self._map.get_size()
+
+    def __str__(self) -> str:
+        """Override string method to provide more readable output."""
+        return type(self).__name__ + '(' + str(list(self)) + ')'
+
+
+class KeysView(_MapView):
+    """
+    View of the keys of a HashMap
+    """
+
+    __slots__ = ()
+
+    def __iter__(self):
+        return (entry.key for entry in self._map._entries())
+
+    def __contains__(self, key: str) -> bool:
+        return self._map.contains_key(key)
+
+
+class ValuesView(_MapView):
+    """
+    View of the values of a HashMap
+    """
+
+    __slots__ = ()
+
+    def __iter__(self):
+        return (entry.value for entry in self._map._entries())
+
+
+class ItemsView(_MapView):
+    """
+    View of the (key, value) pairs of a HashMap
+    """
+
+    __slots__ = ()
+
+    def __iter__(self):
+        return ((entry.key, entry.value) for entry in self._map._entries())
+
+    def __contains__(self, item: tuple) -> bool:
+        key, value = item
+        return self._map.contains_key(key) and self._map.get(key) == value
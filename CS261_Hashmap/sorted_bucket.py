@@ -0,0 +1,81 @@
+# Name: Tom Haney
+# Course: CS261 - Data Structures
+# Description: A bucket for the chaining HashMap that keeps its nodes sorted
+#  by (hash, key) in an array, so finding a key is a binary search instead of
+#  a walk down the whole chain. The map swaps a LinkedList for one of these
+#  once a chain grows past a threshold, and swaps back once it shrinks.
+
+from bisect import bisect_left
+
+from a6_include import SLNode
+
+
+class SortedBucket:
+    """
+    Sorted array bucket with the same methods the chaining HashMap uses on
+    a LinkedList: insert, remove, contains, lookup, length, iterator
+    """
+
+    __slots__ = ('_order', '_nodes')
+
+    def __init__(self, nodes=()) -> None:
+        """
+        Initialize the bucket with the given nodes (in any order).
+        """
+        self._nodes = sorted(nodes, key=lambda node: (node.hash, node.key))
+        self._order = [(node.hash, node.key) for node in self._nodes]
+
+    def __str__(self) -> str:
+        """Override string method to provide more readable output."""
+        content = ' -> '.join(str(node) for node in self._nodes)
+        return 'SORTED [' + content + ']'
+
+    def __iter__(self):
+        """Return an iterator over the nodes, in sorted order."""
+        return iter(self._nodes)
+
+    def _position(self, key: str, hash: int) -> int:
+        """
+        Returns the index of the node with matching key and hash, or -1.
+        """
+        idx = bisect_left(self._order, (hash, key))
+        if idx < len(self._order) and self._order[idx] == (hash, key):
+            return idx
+        return -1
+
+    def insert(self, key: str, value: object, hash: int = None) -> None:
+        """Insert new node in sorted position."""
+        idx = bisect_left(self._order, (hash, key))
+        self._order.insert(idx, (hash, key))
+        self._nodes.insert(idx, SLNode(key, value, None, hash))
+
+    def remove(self, key: str, hash: int = None) -> bool:
+        """
+        Remove node with matching key.
+        Return True if removal was successful, False otherwise.
+        """
+        idx = self._position(key, hash)
+        if idx < 0:
+            return False
+        del self._order[idx]
+        del self._nodes[idx]
+        return True
+
+    def contains(self, key: str, hash: int = None) -> SLNode:
+        """Return node with matching key, or None if no match."""
+        idx = self._position(key, hash)
+        if idx < 0:
+            return None
+        return self._nodes[idx]
+
+    def lookup(self, key: str, hash: int = None,
+               reorder: str = None) -> SLNode:
+        """
+        Return node with matching key, or None if no match. The order is
+        fixed by the sort, so reorder is ignored.
+        """
+        return self.contains(key, hash)
+
+    def length(self) -> int:
+        """Return the number of nodes in the bucket."""
+        return len(self._nodes)
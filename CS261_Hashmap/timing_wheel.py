@@ -0,0 +1,161 @@
+# Name: Tom Haney
+# Course: CS261 - Data Structures
+# Description: Hierarchical timing wheel that tracks when the keys of a Hash
+#  Map expire. Time is counted in ticks. Level 0 has one slot per tick for
+#  the next 64 ticks, level 1 one slot per 64 ticks for the next 64 * 64,
+#  and so on. A timer goes in the coarsest slot that still tells it apart
+#  from now, and is cascaded down into a finer level as its slot comes
+#  round, so each timer is moved at most once per level. Advancing the
+#  wheel costs O(1) per tick plus the timers that fire, and stretches with
+#  no timers in the lower levels are skipped in one step, so catching up
+#  after a long idle period is cheap too.
+
+import time
+from math import ceil
+
+
+SLOT_BITS = 6
+SLOTS = 1 << SLOT_BITS
+LEVELS = 4
+
+# Timers further out than this are parked in the top level and re-placed
+# each time their slot comes round
+_SPAN = SLOTS ** LEVELS
+
+
+class Timer:
+    """
+    Expiry of one key, linked into a circular list in its wheel slot
+    """
+
+    __slots__ = ('key', 'hash', 'expires', 'level', 'prev', 'next')
+
+    def __init__(self, key: object = None, hash: int = None,
+                 expires: int = 0) -> None:
+        self.key = key
+        self.hash = hash
+        self.expires = expires
+        self.level = 0
+        self.prev = self
+        self.next = self
+
+
+class TimingWheel:
+    def __init__(self, tick: float = 0.01, clock: callable = time.monotonic):
+        """
+        Initialize an empty wheel that counts time from clock (in seconds)
+          in steps of tick seconds.
+        """
+        if tick <= 0:
+            raise ValueError("tick must be above 0")
+
+        self._tick = tick
+        self._clock = clock
+
+        # Every tick up to and including self._now has been processed
+        self._now = self._current_tick()
+
+        # Each slot is the sentinel of a circular list of timers
+        self._wheels = [[Timer() for _ in range(SLOTS)]
+                        for _ in range(LEVELS)]
+        self._counts = [0] * LEVELS
+
+    def _current_tick(self) -> int:
+        """
+        Returns the tick the clock is in now.
+        """
+        return int(self._clock() // self._tick)
+
+    def __len__(self) -> int:
+        return sum(self._counts)
+
+    def schedule(self, key: object, hash: int, ttl: float) -> Timer:
+        """
+        Returns a new timer for key that fires once ttl seconds have
+          passed, never sooner and at most one tick later.
+        """
+        if ttl <= 0:
+            raise ValueError("ttl must be above 0")
+
+        expires = ceil((self._clock() + ttl) / self._tick)
+        timer = Timer(key, hash, max(expires, self._now + 1))
+        self._place(timer)
+        return timer
+
+    def _place(self, timer: Timer) -> None:
+        """
+        Links timer into the coarsest slot that separates it from now.
+        """
+        delta = min(timer.expires - self._now, _SPAN - 1)
+        slot_time = self._now + delta
+        level = 0
+        while delta >= SLOTS ** (level + 1):
+            level += 1
+
+        sentinel = self._wheels[level][(slot_time >> (SLOT_BITS * level)) &
+                                       (SLOTS - 1)]
+        timer.level = level
+        timer.prev = sentinel.prev
+        timer.next = sentinel
+        sentinel.prev.next = timer
+        sentinel.prev = timer
+        self._counts[level] += 1
+
+    def cancel(self, timer: Timer) -> None:
+        """
+        Unlinks a timer that has not fired yet.
+        """
+        timer.prev.next = timer.next
+        timer.next.prev = timer.prev
+        timer.prev = timer.next = timer
+        self._counts[timer.level] -= 1
+
+    def _take_slot(self, level: int, idx: int) -> list:
+        """
+        Unlinks and returns every timer in a slot.
+        """
+        sentinel = self._wheels[level][idx]
+        timers = []
+        timer = sentinel.next
+        while timer is not sentinel:
+            timers.append(timer)
+            timer = timer.next
+        sentinel.prev = sentinel.next = sentinel
+        self._counts[level] -= len(timers)
+        return timers
+
+    def advance(self) -> list:
+        """
+        Processes every tick up to the current one, returning the timers
+          that fired (in no particular order).
+        """
+        target = self._current_tick()
+        fired = []
+        while self._now < target:
+            # Skip straight to the next tick that cascades a level that
+            # holds timers, or that fires a level 0 slot
+            empty = 0
+            while empty < LEVELS and not self._counts[empty]:
+                empty += 1
+            if empty == LEVELS:
+                self._now = target
+                break
+            if empty:
+                self._now = min(target,
+                                self._now | ((1 << (SLOT_BITS * empty)) - 1))
+                if self._now == target:
+                    break
+
+            self._now += 1
+            now = self._now
+
+            # Cascade from the top down, so a timer can fall through
+            # several levels in the same tick
+            for level in range(LEVELS - 1, 0, -1):
+                if now & ((1 << (SLOT_BITS * level)) - 1) == 0:
+                    idx = (now >> (SLOT_BITS * level)) & (SLOTS - 1)
+                    for timer in self._take_slot(level, idx):
+                        self._place(timer)
+
+            fired += self._take_slot(0, now & (SLOTS - 1))
+        return fired